@@ -5,8 +5,8 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('player.py', '.'), ('recorder.py', '.'), ('config.py', '.'), ('hook-win32api.py', '.')],
-    hiddenimports=[],
+    datas=[('player.py', '.'), ('recorder.py', '.'), ('config.py', '.'), ('timing.py', '.'), ('plan.py', '.'), ('mouse_path.py', '.'), ('recording_format.py', '.'), ('capture_log.py', '.'), ('path_simplify.py', '.'), ('input_backend.py', '.'), ('input_batch.py', '.'), ('recording_library.py', '.'), ('startup.py', '.'), ('idle_trim.py', '.'), ('playback_trace.py', '.'), ('playback_worker.py', '.'), ('status_bus.py', '.'), ('seek.py', '.'), ('holds.py', '.'), ('hook-win32api.py', '.')],
+    hiddenimports=['win32api', 'win32con'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
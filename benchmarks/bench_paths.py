@@ -0,0 +1,112 @@
+"""Per-move cost of human-like path generation: old scalar loops vs batched kernels.
+
+Run from the project root:  python benchmarks/bench_paths.py
+"""
+import os
+import sys
+import math
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mouse_path
+
+# --- Previous implementation, kept here as the baseline -----------------------
+
+def legacy_bezier(x0, y0, x1, y1, num_points, gaming_mode):
+    mid_x = (x0 + x1) / 2
+    mid_y = (y0 + y1) / 2
+    distance = math.sqrt((x1 - x0)**2 + (y1 - y0)**2)
+    max_deviation = min(distance * (0.05 if gaming_mode else 0.15), 0.2)
+    angle = math.atan2(y1 - y0, x1 - x0) - math.pi/2
+    deviation = max_deviation * np.random.uniform(-1, 1)
+    cx = max(0.0, min(1.0, mid_x + deviation * math.cos(angle)))
+    cy = max(0.0, min(1.0, mid_y + deviation * math.sin(angle)))
+    points = []
+    for i in range(num_points + 1):
+        t = i / num_points
+        x = (1-t)**2 * x0 + 2*(1-t)*t * cx + t**2 * x1
+        y = (1-t)**2 * y0 + 2*(1-t)*t * cy + t**2 * y1
+        points.append((x, y))
+    return points
+
+def legacy_jitter(points, micro_jitter, gaming_mode):
+    jittered_points = []
+    for i, (x, y) in enumerate(points):
+        progress = i / len(points)
+        intensity = micro_jitter * (0.05 if gaming_mode else 0.1) * (1 - progress * 0.7)
+        if i > 0:
+            prev_x, prev_y = jittered_points[-1]
+            intensity = min(intensity, math.sqrt((x - prev_x)**2 + (y - prev_y)**2) * 0.3)
+        new_x = max(0.0, min(1.0, x + np.random.uniform(-intensity, intensity)))
+        new_y = max(0.0, min(1.0, y + np.random.uniform(-intensity, intensity)))
+        jittered_points.append((new_x, new_y))
+    return jittered_points
+
+def legacy_timing(num_points, distance, gaming_mode):
+    def ease(t):
+        if gaming_mode:
+            return t
+        if t < 0.5:
+            return 4 * t * t * t
+        t_adj = t - 1
+        return 4 * t_adj * t_adj * t_adj + 1
+    timings = []
+    total_time = max(0.03, distance * 0.08) * (0.6 if gaming_mode else 1.0)
+    for i in range(num_points - 1):
+        t = i / (num_points - 2)
+        if i == 0:
+            segment_time = total_time * ease(t)
+        else:
+            segment_time = total_time * (ease(t) - ease((i-1) / (num_points - 2)))
+        segment_time *= 1 + np.random.uniform(-0.02, 0.02) * (0.3 if gaming_mode else 1.0)
+        timings.append(max(0.003 if gaming_mode else 0.005, segment_time))
+    return timings
+
+# ------------------------------------------------------------------------------
+
+def make_moves(count, seed):
+    rng = np.random.default_rng(seed)
+    moves = []
+    for _ in range(count):
+        x0, y0, x1, y1 = rng.uniform(0.0, 1.0, 4)
+        distance = math.sqrt((x1 - x0)**2 + (y1 - y0)**2)
+        moves.append((x0, y0, x1, y1, distance, max(3, min(25, int(distance * 30)))))
+    return moves
+
+def bench_legacy(moves, gaming_mode):
+    start = time.perf_counter()
+    for x0, y0, x1, y1, distance, num_points in moves:
+        points = legacy_bezier(x0, y0, x1, y1, num_points, gaming_mode)
+        legacy_jitter(points, 0.5, gaming_mode)
+        legacy_timing(num_points, distance, gaming_mode)
+    return (time.perf_counter() - start) / len(moves)
+
+def bench_batched(moves, gaming_mode, seed):
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for x0, y0, x1, y1, distance, num_points in moves:
+        points = mouse_path.bezier_path(rng, x0, y0, x1, y1, num_points, gaming_mode)
+        mouse_path.micro_jitter(rng, points, 0.5, gaming_mode)
+        mouse_path.human_timing(rng, num_points, distance, gaming_mode)
+    return (time.perf_counter() - start) / len(moves)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moves", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    moves = make_moves(args.moves, args.seed)
+    for gaming_mode in (False, True):
+        before = bench_legacy(moves, gaming_mode)
+        after = bench_batched(moves, gaming_mode, args.seed)
+        label = "gaming" if gaming_mode else "normal"
+        print(f"{label:<7} before={before * 1e6:7.1f}us/move after={after * 1e6:7.1f}us/move "
+              f"speedup={before / after:4.1f}x")
+
+if __name__ == "__main__":
+    main()
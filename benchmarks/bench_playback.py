@@ -0,0 +1,259 @@
+"""Playback timing fidelity on synthetic recordings.
+
+Builds recordings in the Recorder.save_recording schema (dense mouse paths,
+rapid key chords, long holds, hour-long idle gaps), replays them through
+Player against the simulated backend and measures how late every injected
+action was relative to its recorded time. Results are written as JSON so
+runs can be compared across commits.
+
+Run from the project root:  python benchmarks/bench_playback.py -o before.json
+Scenarios longer than --max-seconds are replayed at a higher playback speed
+(recorded in the results) so the idle-gap scenario finishes in seconds.
+Lateness includes the player's deliberate +-1-2ms timing variation on
+events more than 10ms apart; runs use a fixed seed so it is comparable.
+"""
+import os
+import sys
+import json
+import time
+import math
+import argparse
+import platform
+import subprocess
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from player import Player
+from input_backend import SimulatedBackend
+from plan import OP_MOVE, OP_KEY_PRESS
+import recording_format
+
+SCREEN = {"width": 1920, "height": 1080, "left": 0, "top": 0}
+CHORD_KEYS = ["w", "a", "s", "d", "key.space", "key.shift"]
+
+# --- Synthetic recordings -------------------------------------------------------
+
+def _recording(events):
+    return {"virtual_screen": dict(SCREEN), "events": events, "gaming_mode": False}
+
+def _press(events, key, start, end):
+    events.append(("key_press", key, start))
+    events.append(("key_duration", key, end - start))
+    events.append(("key_release", key, end))
+
+def dense_path(rng, moves=2000, interval=0.004):
+    """Continuous mouse motion sampled every few milliseconds"""
+    events = []
+    for i in range(moves):
+        angle = i * 0.02
+        x = 0.5 + 0.2 * math.cos(angle) + rng.uniform(-0.002, 0.002)
+        y = 0.5 + 0.2 * math.sin(angle) + rng.uniform(-0.002, 0.002)
+        events.append(("move", x, y, round(0.1 + i * interval, 6)))
+    return _recording(events)
+
+def key_chords(rng, chords=150, spacing=0.06):
+    """Several keys pressed within a millisecond of each other, short holds"""
+    events = []
+    t = 0.1
+    for _ in range(chords):
+        keys = rng.choice(CHORD_KEYS, size=3, replace=False)
+        starts = [t + i * 0.0005 for i in range(len(keys))]
+        hold = rng.uniform(0.02, 0.04)
+        for key, start in zip(keys, starts):
+            events.append(("key_press", str(key), start))
+        for key, start in zip(keys, starts):
+            events.append(("key_duration", str(key), hold))
+            events.append(("key_release", str(key), start + hold))
+        t += spacing
+    return _recording(_order(events))
+
+def long_holds(rng, holds=4, hold=2.0):
+    """Movement keys held for seconds while the mouse keeps moving"""
+    events = []
+    t = 0.1
+    for i in range(holds):
+        key = CHORD_KEYS[i % 4]
+        events.append(("key_press", key, t))
+        steps = int(hold / 0.01)
+        for step in range(1, steps):
+            x = 0.3 + 0.4 * step / steps
+            events.append(("move", x, 0.5 + rng.uniform(-0.01, 0.01), t + step * 0.01))
+        events.append(("key_duration", key, hold))
+        events.append(("key_release", key, t + hold))
+        t += hold + 0.2
+    return _recording(events)
+
+def idle_loop(rng, gaps=3, gap=3600.0):
+    """A short burst of input, then an hour of nothing, repeated"""
+    events = []
+    t = 0.1
+    for _ in range(gaps):
+        for i in range(20):
+            events.append(("move", 0.4 + i * 0.01, 0.4, t + i * 0.01))
+        _press(events, "e", t + 0.25, t + 0.35)
+        t += gap
+    return _recording(events)
+
+def _order(events):
+    """Recorder order: by time, with key_duration right before its release"""
+    timed = []
+    for i, event in enumerate(events):
+        if event[0] == "key_duration":
+            continue
+        timed.append((event[-1], i, event))
+    durations = {}
+    for event in events:
+        if event[0] == "key_duration":
+            durations.setdefault(event[1], []).append(event)
+    ordered = []
+    for _, _, event in sorted(timed):
+        if event[0] == "key_release" and durations.get(event[1]):
+            ordered.append(durations[event[1]].pop(0))
+        ordered.append(event)
+    return ordered
+
+SCENARIOS = {
+    "dense_path": dense_path,
+    "key_chords": key_chords,
+    "long_holds": long_holds,
+    "idle_loop": idle_loop,
+}
+
+# --- Measurement ----------------------------------------------------------------
+
+def expected_actions(plan):
+    """(action, code, recorded time) the player should inject for each plan row"""
+    expected = []
+    release_at = {}  # Pending release time per key, like Player.active_keys
+    for timestamp, op, _, _, _, _, code, value in plan.rows():
+        if op == OP_MOVE:
+            expected.append(("move", 0, timestamp))
+        elif op == OP_KEY_PRESS:
+            expected.append(("key_down", code, timestamp))
+            held = release_at.get(code, -1.0) > timestamp
+            if value == value and not held:
+                expected.append(("key_up", code, value))
+                release_at[code] = value
+    return expected
+
+def match_lateness(expected, log, start_ns, speed):
+    """Lateness of each logged action against the recorded schedule, matched in
+    order per (action, key)"""
+    queues = {}
+    for action, code, t in sorted(expected, key=lambda e: e[2]):
+        queues.setdefault((action, code), []).append(t)
+    positions = dict.fromkeys(queues, 0)
+    lateness = []
+    for ns, action, args in log:
+        key = (action, args[0] if action in ("key_down", "key_up") else 0)
+        if key not in queues or positions[key] >= len(queues[key]):
+            continue
+        t = queues[key][positions[key]]
+        positions[key] += 1
+        lateness.append((ns - start_ns) / 1e9 - t / speed)
+    return np.asarray(lateness, dtype=np.float64)
+
+def summarize(values):
+    if not len(values):
+        return {}
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+        "min": float(values.min()),
+        "mean": float(values.mean())
+    }
+
+def run_scenario(name, recording, args):
+    if args.format == "binary":
+        recording = recording_format.from_json_dict(recording)
+    backend = SimulatedBackend()
+    player = Player(backend=backend)
+    player.human_like_mouse = False  # One injected move per recorded move
+    player.jitter = 0
+    player.random_seed = args.seed
+
+    plan = player.compile(recording)
+    speed = max(1.0, plan.end_time / args.max_seconds) if args.max_seconds else 1.0
+    player.playback_speed = speed
+
+    cpu_start = time.process_time()
+    start_ns = time.perf_counter_ns()
+    player.play(plan)
+    wall = (time.perf_counter_ns() - start_ns) / 1e9
+    cpu = time.process_time() - cpu_start
+
+    expected = expected_actions(plan)
+    lateness = match_lateness(expected, backend.log, start_ns, speed)
+    final_drift = float(lateness[-1]) if len(lateness) else 0.0
+    return {
+        "scenario": name,
+        "format": args.format,
+        "playback_speed": speed,
+        "recorded_duration": plan.end_time,
+        "plan_rows": len(plan),
+        "expected_actions": len(expected),
+        "injected_actions": len(backend.log),
+        "matched_actions": int(len(lateness)),
+        "lateness": summarize(lateness),
+        "total_drift": final_drift,
+        "wall_time": wall,
+        "cpu_time": cpu,
+        "cpu_percent": cpu / wall * 100 if wall else 0.0,
+        "events_per_second": len(backend.log) / wall if wall else 0.0,
+        "timer": player.timing_stats
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("-o", "--output", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--format", choices=("json", "binary"), default="json",
+                        help="Replay the recordings as JSON dicts or columnar recordings")
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="Speed up scenarios longer than this (0 = always real time)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--save-recordings", metavar="DIR",
+                        help="Also save the synthetic recordings as JSON files")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        recording = SCENARIOS[name](np.random.default_rng(args.seed))
+        if args.save_recordings:
+            os.makedirs(args.save_recordings, exist_ok=True)
+            recording_format.save_json(os.path.join(args.save_recordings, name + ".json"), recording)
+        result = run_scenario(name, recording, args)
+        results.append(result)
+        lateness = result["lateness"]
+        print(f"{name:<12} p50={lateness.get('p50', 0) * 1e3:7.3f}ms p99={lateness.get('p99', 0) * 1e3:7.3f}ms "
+              f"max={lateness.get('max', 0) * 1e3:7.3f}ms drift={result['total_drift'] * 1e3:7.3f}ms "
+              f"cpu={result['cpu_percent']:5.1f}% {result['events_per_second']:8.0f} ev/s", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Stop latency: how long input keeps flowing after Player.stop().
+
+Plays synthetic recordings of different shapes against the simulated
+backend, calls stop() from another thread at a random point and measures
+
+- stop_return: time until stop() returns
+- quiet: time from stop() to the last action the backend received
+- held_after: keys/buttons still held once stop() returned (must be 0)
+
+Shapes cover where a stop can land: an hour-long idle gap, a long key hold
+with no other input, a human-like mouse path, a gradual move across a wild
+jump and a click settle delay. Results are written as JSON.
+
+Run from the project root:  python benchmarks/bench_stop_latency.py -o stop.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from player import Player
+from input_backend import SimulatedBackend
+from bench_playback import _recording, _press, summarize, git_commit
+
+def idle_gap(rng):
+    """A key tap, an hour of nothing, another tap"""
+    events = []
+    _press(events, "e", 0.1, 0.15)
+    _press(events, "e", 3600.0, 3600.05)
+    return _recording(events)
+
+def long_hold(rng):
+    """One key held for a minute"""
+    events = []
+    _press(events, "w", 0.1, 60.0)
+    return _recording(events)
+
+def human_path(rng, moves=200):
+    """Mouse moves far enough apart that each one becomes a Bezier path"""
+    events = []
+    for i in range(moves):
+        events.append(("move", float(rng.uniform(0.2, 0.6)), float(rng.uniform(0.2, 0.6)), 0.1 + i * 0.05))
+    return _recording(events)
+
+def gradual_move(rng, jumps=100):
+    """Jumps across more than half the screen, walked in steps"""
+    events = []
+    for i in range(jumps):
+        x = 0.05 if i % 2 else 0.95
+        events.append(("move", x, 0.5, 0.1 + i * 0.05))
+    return _recording(events)
+
+def click_settle(rng, clicks=100):
+    """Clicks, each preceded by the hover settle delay"""
+    events = []
+    for i in range(clicks):
+        t = 0.1 + i * 0.3
+        events.append(("click", 0.5, 0.5, "left", True, t))
+        events.append(("click", 0.5, 0.5, "left", False, t + 0.1))
+    return _recording(events)
+
+SCENARIOS = {
+    "idle_gap": idle_gap,
+    "long_hold": long_hold,
+    "human_path": human_path,
+    "gradual_move": gradual_move,
+    "click_settle": click_settle,
+}
+
+def run_trial(recording, stop_after, seed):
+    backend = SimulatedBackend()
+    player = Player(backend=backend)
+    player.random_seed = seed
+    player.human_like_mouse = True
+    plan = player.compile(recording)
+
+    thread = threading.Thread(target=player.play, args=(plan,), daemon=True)
+    thread.start()
+    time.sleep(stop_after)
+
+    stop_ns = time.perf_counter_ns()
+    quiet = player.stop()
+    returned_ns = time.perf_counter_ns()
+    held = len(backend.held_keys) + len(backend.held_buttons)
+    thread.join()
+
+    last_ns = backend.log[-1][0] if backend.log else stop_ns
+    return {
+        "stop_return": (returned_ns - stop_ns) / 1e9,
+        "quiet": max(0, last_ns - stop_ns) / 1e9,
+        "held_after": held,
+        "finished_in_time": quiet,
+        "actions_after_stop": sum(1 for ns, _, _ in backend.log if ns > stop_ns)
+    }
+
+def run_scenario(name, recording, args):
+    rng = np.random.default_rng(args.seed)
+    trials = [run_trial(recording, float(rng.uniform(args.min_delay, args.max_delay)), args.seed + i)
+              for i in range(args.trials)]
+    return {
+        "scenario": name,
+        "trials": len(trials),
+        "stop_return": summarize(np.asarray([t["stop_return"] for t in trials])),
+        "quiet": summarize(np.asarray([t["quiet"] for t in trials])),
+        "held_after": int(sum(t["held_after"] for t in trials)),
+        "timeouts": int(sum(not t["finished_in_time"] for t in trials)),
+        "max_actions_after_stop": int(max(t["actions_after_stop"] for t in trials))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("-o", "--output", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("-n", "--trials", type=int, default=20, help="Stops per scenario")
+    parser.add_argument("--min-delay", type=float, default=0.2, help="Earliest stop after play starts (s)")
+    parser.add_argument("--max-delay", type=float, default=0.6, help="Latest stop after play starts (s)")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        result = run_scenario(name, SCENARIOS[name](np.random.default_rng(args.seed)), args)
+        results.append(result)
+        stop_return, quiet = result["stop_return"], result["quiet"]
+        print(f"{name:<13} stop p50={stop_return['p50'] * 1e3:7.3f}ms max={stop_return['max'] * 1e3:7.3f}ms "
+              f"quiet p99={quiet['p99'] * 1e3:7.3f}ms max={quiet['max'] * 1e3:7.3f}ms "
+              f"held={result['held_after']} timeouts={result['timeouts']}", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
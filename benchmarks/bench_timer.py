@@ -0,0 +1,53 @@
+"""Compare the hybrid sleep-then-spin timer against a pure busy-wait.
+
+Run from the project root:  python benchmarks/bench_timer.py
+Works on Linux (perf_counter_ns clock) and Windows (QPC clock).
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from timing import PreciseTimer
+
+def busy_wait(duration):
+    """The old precise_sleep: spin for the whole wait"""
+    target = time.perf_counter_ns() + int(duration * 1e9)
+    while time.perf_counter_ns() < target:
+        pass
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run(name, sleep_fn, durations):
+    errors = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for duration in durations:
+        start = time.perf_counter_ns()
+        sleep_fn(duration)
+        errors.append((time.perf_counter_ns() - start) / 1e9 - duration)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    print(f"{name:<22} p50={percentile(errors, 50) * 1e6:8.1f}us "
+          f"p99={percentile(errors, 99) * 1e6:8.1f}us "
+          f"max={max(errors) * 1e6:8.1f}us cpu={cpu / wall * 100:5.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=0.01, help="Seconds per wait")
+    args = parser.parse_args()
+
+    durations = [args.duration] * args.iterations
+    run("busy-wait", busy_wait, durations)
+    for threshold in (0.0002, 0.0005, 0.001):
+        timer = PreciseTimer(spin_threshold=threshold)
+        run(f"hybrid ({threshold * 1000:.1f}ms spin)", timer.sleep, durations)
+
+if __name__ == "__main__":
+    main()
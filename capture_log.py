@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import glob
+import threading
+
+# Segment files live next to the recordings until the capture is saved
+CAPTURE_DIR = os.path.join(os.path.dirname(__file__), "recordings", ".capture")
+SEGMENT_EXTENSION = ".seg"
+SEGMENT_FORMAT = "rmac-capture"
+SEGMENT_VERSION = 1
+
+class CaptureLog:
+    """Append-only on-disk log of a capture in progress.
+
+    Listener threads push events into a fixed ring with `append`, which never
+    touches the disk. A background writer drains the ring in batches and
+    appends them as JSON lines to a segment file, so an unclean exit loses at
+    most the last flush interval. The first line of the segment is a header
+    with the recording metadata.
+    """
+
+    def __init__(self, path, header, ring_size=8192, flush_interval=0.25, fsync=True):
+        self.path = path
+        self.header = header
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.count = 0        # Events appended
+        self.written = 0      # Events persisted
+        self.overflowed = 0   # Events that went through the overflow list
+
+        self._ring = [None] * ring_size
+        self._head = 0  # Next slot to write (monotonic)
+        self._tail = 0  # Next slot to drain (monotonic)
+        self._overflow = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = None
+        self._file = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        header = dict(self.header, format=SEGMENT_FORMAT, version=SEGMENT_VERSION, started=time.time())
+        self._file.write(json.dumps(header) + "\n")
+        self._file.flush()
+        self._writer = threading.Thread(target=self._write_loop, name="capture-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, event):
+        """Queue an event for the writer; safe to call from any thread"""
+        ring_size = len(self._ring)
+        with self._lock:
+            self.count += 1
+            # Once anything spilled, keep spilling until the writer catches up
+            # so events stay in order
+            if self._overflow or self._head - self._tail >= ring_size:
+                self._overflow.append(event)
+                self.overflowed += 1
+            else:
+                self._ring[self._head % ring_size] = event
+                self._head += 1
+            backlog = self._head - self._tail
+        if backlog >= ring_size // 2:
+            self._wake.set()
+
+    def _drain(self):
+        ring_size = len(self._ring)
+        with self._lock:
+            head, tail = self._head, self._tail
+            start, end = tail % ring_size, head % ring_size
+            if head == tail:
+                batch = []
+            elif start < end:
+                batch = self._ring[start:end]
+            else:
+                batch = self._ring[start:] + self._ring[:end]
+            self._tail = head
+            overflow, self._overflow = self._overflow, []
+        return batch + overflow
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed
+            self._flush(self._drain())
+            if closing:
+                break
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        self._file.write("".join(json.dumps(event) + "\n" for event in batch))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.written += len(batch)
+
+    def close(self):
+        """Flush everything still buffered and stop the writer"""
+        if self._closed:
+            return self.written
+        self._closed = True
+        self._wake.set()
+        if self._writer:
+            self._writer.join()
+        if self._file:
+            self._file.close()
+        return self.written
+
+    def read(self):
+        """Recording data persisted so far (see read_segment)"""
+        return read_segment(self.path)
+
+    def discard(self):
+        """Close and delete the segment"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def new_segment_path(directory=CAPTURE_DIR):
+    return os.path.join(directory, f"capture_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}{SEGMENT_EXTENSION}")
+
+def read_segment(path):
+    """Rebuild recording data from a segment, ignoring a torn last line"""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        for line in f:
+            if not line.endswith("\n"):
+                break  # Partially written batch from a crash
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                break
+    return {
+        "virtual_screen": header.get("virtual_screen", {}),
+        "events": events,
+        "gaming_mode": header.get("gaming_mode", False)
+    }
+
+def pending_captures(directory=CAPTURE_DIR):
+    """Segments left behind by a capture that never got saved or discarded"""
+    return sorted(glob.glob(os.path.join(directory, "*" + SEGMENT_EXTENSION)))
@@ -1,9 +1,38 @@
 import json
 import os
+import time
+import atexit
+import weakref
+import threading
+
+MAX_RETRY_DELAY = 60.0  # Longest wait between attempts to write a config that keeps failing
 
 class Config:
-    def __init__(self):
-        self.config_path = os.path.join(os.path.dirname(__file__), "config.json")
+    """In-memory settings backed by config.json.
+
+    `set`/`update` only touch the cache and notify subscribers; the file is
+    written by a background thread once changes stop for `save_delay`
+    seconds (at most `max_delay` after the first one), so a slider drag
+    costs one write instead of dozens.
+
+    With persist=False the file is only read: a mirror of another process's
+    settings that is kept current through `update`.
+    """
+
+    def __init__(self, config_path=None, save_delay=0.5, max_delay=2.0, persist=True):
+        self.config_path = config_path or os.path.join(os.path.dirname(__file__), "config.json")
+        self.persist = persist
+        self.save_delay = save_delay
+        self.max_delay = max_delay
+        self.writes = 0  # Times the file was actually written
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # One writer of config.json(.tmp) at a time
+        self._listeners = []
+        self._dirty_since = None  # When the first unsaved change happened
+        self._changed_since_snapshot = None  # First change after the last save took its snapshot
+        self._last_change = 0.0
+        self._wake = threading.Event()
+        self._writer = None
         self.default = {
             "always_on_top": True,
             "playback_speed": 1.0,
@@ -17,7 +46,17 @@ class Config:
             "stop_key": "]",
             "repeat_enabled": False,
             "repeat_infinite": True,
-            "repeat_count": 5
+            "repeat_count": 5,
+            "recording_format": "binary",  # "binary" (.rmb) or "json"
+            "streaming_capture": True,     # Write events to disk while recording
+            "move_tolerance": 3.0,         # Max mouse path error after simplification (px)
+            "move_max_interval": 0.25,     # Max gap between recorded mouse samples (s)
+            "batched_input": True,         # Coalesce same-tick input into one SendInput call
+            "plan_cache_mb": 256,          # Memory for compiled recordings kept ready to play
+            "trim_dead_time": False,       # Skip dead time at the start and around the record/stop hotkeys
+            "max_idle_gap": 0.0,           # Cap idle stretches during playback (s), 0 = play them as recorded
+            "trace_playback": False,       # Record a timing trace of each playback to traces/ (Chrome/Perfetto format)
+            "playback_process": False      # Play in a separate high-priority process, away from the UI
         }
         self.load()
     
@@ -32,17 +71,110 @@ class Config:
                         self.settings[k] = v
             else:
                 self.settings = self.default.copy()
-                self.save()
+                if self.persist:
+                    self.save()
         except:
             self.settings = self.default.copy()
     
     def save(self):
-        with open(self.config_path, 'w') as f:
-            json.dump(self.settings, f, indent=2)
+        """Write the settings now (temp file + rename, never a half-written file).
+        Changes stay pending until a write succeeds, so a failed one is retried."""
+        with self._save_lock:
+            with self._lock:
+                snapshot = json.dumps(self.settings, indent=2)
+                self._changed_since_snapshot = None
+            temp_path = self.config_path + ".tmp"
+            with open(temp_path, 'w') as f:
+                f.write(snapshot)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
+            self.writes += 1
+            with self._lock:
+                # Written: only what changed after the snapshot is still pending
+                self._dirty_since = self._changed_since_snapshot
     
     def get(self, key):
         return self.settings.get(key, self.default[key])
     
     def set(self, key, value):
-        self.settings[key] = value
-        self.save()
\ No newline at end of file
+        self.update({key: value})
+    
+    def update(self, values):
+        """Change several settings at once; one notification per changed key, one deferred write"""
+        with self._lock:
+            changed = {k: v for k, v in values.items() if self.settings.get(k) != v or k not in self.settings}
+            if not changed:
+                return
+            self.settings.update(changed)
+            now = time.monotonic()
+            self._last_change = now
+            if self._dirty_since is None:
+                self._dirty_since = now
+            if self._changed_since_snapshot is None:
+                self._changed_since_snapshot = now
+            listeners = [ref() for ref in self._listeners]
+            self._listeners = [ref for ref, callback in zip(self._listeners, listeners) if callback]
+        for key, value in changed.items():
+            for callback in listeners:
+                if callback:
+                    callback(key, value)
+        self._schedule_save()
+    
+    def subscribe(self, callback):
+        """Call callback(key, value) after every setting change.
+        Bound methods are held weakly so subscribers can still be collected."""
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        with self._lock:
+            self._listeners.append(ref)
+    
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._listeners = [ref for ref in self._listeners if ref() not in (None, callback)]
+    
+    def flush(self):
+        """Write pending changes immediately (e.g. on exit)"""
+        if self._dirty_since is not None and self.persist:
+            self.save()
+    
+    def _schedule_save(self):
+        if not self.persist:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="config-writer", daemon=True)
+            self._writer.start()
+        self._wake.set()
+    
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            retry_delay = self.max_delay
+            # Debounce: wait until changes go quiet, but never hold a change too long
+            while True:
+                with self._lock:
+                    if self._dirty_since is None:
+                        break
+                    now = time.monotonic()
+                    due = min(self._last_change + self.save_delay, self._dirty_since + self.max_delay)
+                if now >= due:
+                    try:
+                        self.save()
+                    except OSError:
+                        # Still dirty: try again later (backing off while e.g. the file is locked)
+                        time.sleep(retry_delay)
+                        retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+                    continue  # Anything changed during the write is saved next
+                time.sleep(due - now)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_config():
+    """The process-wide Config, loaded once and flushed at exit"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Config()
+            atexit.register(_shared.flush)
+        return _shared
@@ -0,0 +1,97 @@
+import numpy as np
+
+from plan import OP_MOUSE_DOWN, OP_MOUSE_UP, OP_KEY_PRESS
+
+class HoldIntervals:
+    """Hold intervals (code, start, end) with an index for "what is held at t".
+
+    Stored sorted by code, then start. A press while its code is already
+    held is dropped, as playback ignores it, so one code's holds never
+    overlap. Each code's starts and ends are therefore both sorted, and a
+    point query is one binary search per distinct code. `rows` are the plan
+    rows that started each hold.
+    """
+
+    def __init__(self, codes, starts, ends, rows):
+        order = np.lexsort((starts, codes))
+        codes, starts, ends, rows = codes[order], starts[order], ends[order], rows[order]
+
+        # Drop holds that start while the same code is still held
+        keep = np.ones(len(codes), dtype=bool)
+        held_until = {}
+        for i, (code, start, end) in enumerate(zip(codes.tolist(), starts.tolist(), ends.tolist())):
+            if held_until.get(code, -np.inf) > start:
+                keep[i] = False
+            else:
+                held_until[code] = end
+        self.codes = codes[keep]
+        self.starts = starts[keep]
+        self.ends = ends[keep]
+        self.rows = rows[keep]
+
+        # Segment of each code in the sorted arrays
+        self.distinct, self.offsets = np.unique(self.codes, return_index=True)
+        self.offsets = np.append(self.offsets, len(self.codes))
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.codes, self.starts, self.ends, self.rows, self.distinct, self.offsets))
+
+    def held_at(self, time):
+        """Indices of the holds pressed before `time` and not released by it"""
+        held = []
+        for segment in range(len(self.distinct)):
+            lo, hi = self.offsets[segment], self.offsets[segment + 1]
+            i = lo + int(np.searchsorted(self.starts[lo:hi], time, side="left")) - 1
+            if i >= lo and self.ends[i] > time:
+                held.append(i)
+        return np.asarray(held, dtype=np.intp)
+
+class HoldIndex:
+    """Key and mouse button holds of a compiled plan"""
+
+    def __init__(self, plan):
+        times, ops, codes = plan.times, plan.ops, plan.codes
+
+        presses = np.flatnonzero(ops == OP_KEY_PRESS)
+        key_ends = np.where(np.isnan(plan.values[presses]), np.inf, plan.values[presses])
+        self.keys = HoldIntervals(codes[presses], times[presses], key_ends, presses)
+
+        # Pair each button down with the next up of the same button
+        open_buttons = {}
+        button_codes, button_rows, button_ends = [], [], []
+        for i in np.flatnonzero((ops == OP_MOUSE_DOWN) | (ops == OP_MOUSE_UP)).tolist():
+            code = int(codes[i])
+            if ops[i] == OP_MOUSE_DOWN:
+                open_buttons.setdefault(code, i)
+            elif code in open_buttons:
+                button_codes.append(code)
+                button_rows.append(open_buttons.pop(code))
+                button_ends.append(times[i])
+        for code, row in open_buttons.items():
+            button_codes.append(code)
+            button_rows.append(row)
+            button_ends.append(np.inf)
+        button_rows = np.asarray(button_rows, dtype=np.intp)
+        self.buttons = HoldIntervals(np.asarray(button_codes, dtype=np.int32), times[button_rows],
+                                     np.asarray(button_ends, dtype=np.float64), button_rows)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.buttons.nbytes
+
+    def intervals(self):
+        """(starts, ends) of every key and button hold, sorted by start (end = inf if never released)"""
+        starts = np.concatenate((self.keys.starts, self.buttons.starts))
+        ends = np.concatenate((self.keys.ends, self.buttons.ends))
+        order = np.argsort(starts, kind="stable")
+        return starts[order], ends[order]
+
+def hold_index(plan):
+    """The plan's HoldIndex, built on first use and cached on the plan"""
+    if plan.hold_index is None:
+        plan.hold_index = HoldIndex(plan)
+    return plan.hold_index
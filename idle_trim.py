@@ -0,0 +1,97 @@
+import numpy as np
+
+from plan import PlaybackPlan, OP_KEY_PRESS
+from holds import hold_index
+
+def held_intervals(plan):
+    """(start, end) of every key and mouse button hold in a plan, sorted by start.
+
+    Keys never released are held until the end (end = inf).
+    """
+    return hold_index(plan).intervals()
+
+def find_idle_gaps(plan, threshold):
+    """(indices, idle_starts): gaps times[i] -> times[i+1] with more than
+    threshold seconds of nothing held before times[i+1]. The idle part starts
+    at times[i], or later if a hold runs into the gap"""
+    times = plan.times
+    if len(times) < 2:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float64)
+    gap_start, gap_end = times[:-1], times[1:]
+    candidates = np.flatnonzero(gap_end - gap_start > threshold)
+    idle_starts = gap_start[candidates]
+    if not len(candidates):
+        return candidates, idle_starts
+
+    # Holds only start at rows, so the latest hold end over holds starting
+    # before the gap end is where the gap's idle part begins
+    starts, ends = held_intervals(plan)
+    if len(starts):
+        reach = np.maximum.accumulate(ends)
+        last_started = np.searchsorted(starts, gap_end[candidates], side="left") - 1
+        held_until = np.where(last_started >= 0, reach[np.maximum(last_started, 0)], -np.inf)
+        idle_starts = np.maximum(idle_starts, held_until)
+    idle = gap_end[candidates] - idle_starts > threshold
+    return candidates[idle], idle_starts[idle]
+
+def compress_idle(plan, max_gap=None, trim_leading=True, lead=0.0, drop_codes=()):
+    """Return (new plan, report) with dead time removed.
+
+    - trim_leading: the first event starts `lead` seconds in
+    - max_gap: idle gaps (nothing held) longer than this are clamped to it
+    - drop_codes: key codes removed first (e.g. the record/stop hotkeys, so the
+      idle time before pressing them counts as trailing dead time)
+
+    Only idle time is removed, so every key and button hold keeps its length;
+    the plan runs until its last release (end_time), so dropping the stop
+    hotkey never cuts into a hold still down.
+    The report gives times in recording seconds; divide by the playback speed
+    for wall-clock time saved per iteration.
+    """
+    keep = np.ones(len(plan), dtype=bool)
+    if drop_codes:
+        keep &= ~((plan.ops == OP_KEY_PRESS) & np.isin(plan.codes, list(drop_codes)))
+    source = _subset(plan, keep) if not keep.all() else plan
+    times = source.times
+    original_duration = plan.end_time
+
+    removed = np.zeros(len(times), dtype=np.float64)  # Seconds cut before each event
+    leading = 0.0
+    if trim_leading and len(times) and times[0] > lead:
+        leading = float(times[0] - lead)
+        removed += leading
+
+    clamped, idle_starts = np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float64)
+    if max_gap is not None:
+        clamped, idle_starts = find_idle_gaps(source, max_gap)
+        cut = np.zeros(len(times), dtype=np.float64)
+        cut[clamped + 1] = (times[clamped + 1] - idle_starts) - max_gap
+        removed += np.cumsum(cut)
+
+    # Removed time lies after every hold running into a gap, so releases
+    # move with their press
+    values = source.values.copy()
+    presses = source.ops == OP_KEY_PRESS
+    values[presses] -= removed[presses]
+
+    compressed = PlaybackPlan(
+        times - removed, source.ops, source.rel_x, source.rel_y, source.abs_x, source.abs_y,
+        source.codes, values, source.geometry, source.gaming_mode
+    )
+    compressed.trim_report = report = {
+        "recorded_duration": original_duration,
+        "duration": compressed.end_time,
+        "time_saved": original_duration - compressed.end_time,
+        "leading_trimmed": leading,
+        "dropped_events": int(len(plan) - len(source)),
+        "idle_gaps_clamped": int(len(clamped)),
+        "idle_segments": [(float(start), float(times[i + 1])) for i, start in zip(clamped.tolist(), idle_starts.tolist())]
+    }
+    return compressed, report
+
+def _subset(plan, mask):
+    return PlaybackPlan(
+        plan.times[mask], plan.ops[mask], plan.rel_x[mask], plan.rel_y[mask],
+        plan.abs_x[mask], plan.abs_y[mask], plan.codes[mask], plan.values[mask],
+        plan.geometry, plan.gaming_mode
+    )
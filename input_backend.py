@@ -0,0 +1,234 @@
+import sys
+import time
+
+# Windows virtual key codes for recorded key names (pynput style), usable on
+# any OS so recordings can be compiled without win32 installed
+VK_CODES = {
+    'enter': 0x0D,
+    'esc': 0x1B,
+    'escape': 0x1B,
+    'space': 0x20,
+    'tab': 0x09,
+    'backspace': 0x08,
+    'delete': 0x2E,
+    'del': 0x2E,
+    'insert': 0x2D,
+    'home': 0x24,
+    'end': 0x23,
+    'pageup': 0x21,
+    'page_up': 0x21,
+    'pagedown': 0x22,
+    'page_down': 0x22,
+    'up': 0x26,
+    'down': 0x28,
+    'left': 0x25,
+    'right': 0x27,
+    'f1': 0x70,
+    'f2': 0x71,
+    'f3': 0x72,
+    'f4': 0x73,
+    'f5': 0x74,
+    'f6': 0x75,
+    'f7': 0x76,
+    'f8': 0x77,
+    'f9': 0x78,
+    'f10': 0x79,
+    'f11': 0x7A,
+    'f12': 0x7B,
+    'shift': 0x10,
+    'shift_l': 0x10,
+    'shift_r': 0x10,
+    'ctrl': 0x11,
+    'ctrl_l': 0x11,
+    'ctrl_r': 0x11,
+    'control': 0x11,
+    'alt': 0x12,
+    'alt_l': 0x12,
+    'alt_r': 0x12,
+    'alt_gr': 0x12,
+    'capslock': 0x14,
+    'caps_lock': 0x14,
+    'numlock': 0x90,
+    'num_lock': 0x90,
+    'scrolllock': 0x91,
+    'scroll_lock': 0x91,
+    'pause': 0x13,
+    'print_screen': 0x2C,
+    'win': 0x5B,
+    'command': 0x5B,
+    'cmd': 0x5B,
+    'w': 0x57,  # 'W' key
+    'a': 0x41,  # 'A' key
+    's': 0x53,  # 'S' key
+    'd': 0x44,  # 'D' key
+}
+
+# Button ids used by compiled plans (see plan.BUTTON_IDS)
+BUTTON_LEFT = 1
+BUTTON_RIGHT = 2
+BUTTON_MIDDLE = 3
+
+class InputBackend:
+    """Where the playback engine sends input and reads screen geometry.
+
+    Coordinates are absolute virtual-desktop pixels, buttons are plan button
+    ids and keys are Windows virtual key codes.
+    """
+    name = "base"
+
+    def virtual_screen(self):
+        """(left, top, width, height) of the virtual desktop"""
+        raise NotImplementedError
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def mouse_down(self, x, y, button):
+        raise NotImplementedError
+
+    def mouse_up(self, x, y, button):
+        raise NotImplementedError
+
+    def scroll(self, x, y, dx, dy):
+        raise NotImplementedError
+
+    def key_down(self, vk):
+        raise NotImplementedError
+
+    def key_up(self, vk):
+        raise NotImplementedError
+
+    def flush(self):
+        """Deliver any buffered input (the player calls this before it sleeps)"""
+        pass
+
+    def stats(self):
+        """Injection counters: OS calls made versus actions injected"""
+        return {"calls": 0, "actions": 0, "actions_per_call": 0.0}
+
+    def reset_stats(self):
+        pass
+
+    def char_vk(self, char):
+        """Virtual key code for a single character (0 if it has none)"""
+        if char.isalnum() and char.isascii():
+            return ord(char.upper())
+        return 0
+
+    def resolve_vk(self, key):
+        """Resolve a recorded key name to a virtual key code (0 if unknown)"""
+        key = key.lower()
+        # FIX: Direct virtual key codes for WASD to ensure game compatibility
+        if key in VK_CODES:
+            return VK_CODES[key]
+        if len(key) == 1:  # Character key
+            return self.char_vk(key)
+        # Handle pynput key names ("key.space", "'x'")
+        key_name = key.replace('key.', '').replace("'", "")
+        if len(key_name) == 1:
+            return self.char_vk(key_name)
+        return VK_CODES.get(key_name, 0)
+
+class Win32Backend(InputBackend):
+    """Real input through the Win32 API (mimics real user input)"""
+    name = "win32"
+
+    def __init__(self):
+        import win32api
+        import win32con
+        self._api = win32api
+        self._down_flags = {
+            BUTTON_LEFT: win32con.MOUSEEVENTF_LEFTDOWN,
+            BUTTON_RIGHT: win32con.MOUSEEVENTF_RIGHTDOWN,
+            BUTTON_MIDDLE: win32con.MOUSEEVENTF_MIDDLEDOWN
+        }
+        self._up_flags = {
+            BUTTON_LEFT: win32con.MOUSEEVENTF_LEFTUP,
+            BUTTON_RIGHT: win32con.MOUSEEVENTF_RIGHTUP,
+            BUTTON_MIDDLE: win32con.MOUSEEVENTF_MIDDLEUP
+        }
+        self._wheel = win32con.MOUSEEVENTF_WHEEL
+        self._keyup = win32con.KEYEVENTF_KEYUP
+
+    def virtual_screen(self):
+        metrics = self._api.GetSystemMetrics
+        # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+        return metrics(76), metrics(77), metrics(78), metrics(79)
+
+    def move(self, x, y):
+        self._api.SetCursorPos((int(x), int(y)))
+
+    def mouse_down(self, x, y, button):
+        if button in self._down_flags:
+            self._api.mouse_event(self._down_flags[button], x, y, 0, 0)
+
+    def mouse_up(self, x, y, button):
+        if button in self._up_flags:
+            self._api.mouse_event(self._up_flags[button], x, y, 0, 0)
+
+    def scroll(self, x, y, dx, dy):
+        self._api.mouse_event(self._wheel, x, y, int(dy * 120), 0)
+
+    def key_down(self, vk):
+        self._api.keybd_event(vk, 0, 0, 0)
+
+    def key_up(self, vk):
+        self._api.keybd_event(vk, 0, self._keyup, 0)
+
+    def char_vk(self, char):
+        vk = self._api.VkKeyScan(char)
+        return vk & 0xFF if vk != -1 else 0
+
+class SimulatedBackend(InputBackend):
+    """In-process backend that injects nothing and logs every action.
+
+    Each log entry is (perf_counter_ns, action, args). Lets the whole playback
+    pipeline run headless, e.g. on Linux for benchmarks.
+    """
+    name = "simulated"
+
+    def __init__(self, geometry=(0, 0, 1920, 1080), clock=time.perf_counter_ns):
+        self.geometry = tuple(geometry)
+        self.clock = clock
+        self.log = []
+        self.cursor = (0, 0)
+        self.held_keys = set()
+        self.held_buttons = set()
+
+    def virtual_screen(self):
+        return self.geometry
+
+    def move(self, x, y):
+        self.cursor = (int(x), int(y))
+        self.log.append((self.clock(), "move", (int(x), int(y))))
+
+    def mouse_down(self, x, y, button):
+        self.held_buttons.add(button)
+        self.log.append((self.clock(), "mouse_down", (x, y, button)))
+
+    def mouse_up(self, x, y, button):
+        self.held_buttons.discard(button)
+        self.log.append((self.clock(), "mouse_up", (x, y, button)))
+
+    def scroll(self, x, y, dx, dy):
+        self.log.append((self.clock(), "scroll", (x, y, dx, dy)))
+
+    def key_down(self, vk):
+        self.held_keys.add(vk)
+        self.log.append((self.clock(), "key_down", (vk,)))
+
+    def key_up(self, vk):
+        self.held_keys.discard(vk)
+        self.log.append((self.clock(), "key_up", (vk,)))
+
+    def clear(self):
+        self.log = []
+
+def default_backend():
+    """Win32 input on Windows, the simulated backend anywhere else"""
+    if sys.platform == "win32":
+        try:
+            return Win32Backend()
+        except ImportError:
+            pass
+    return SimulatedBackend()
@@ -0,0 +1,159 @@
+import time
+import ctypes
+
+from input_backend import InputBackend, BUTTON_LEFT, BUTTON_RIGHT, BUTTON_MIDDLE
+
+class BatchingBackend(InputBackend):
+    """Collects every action issued within one scheduler tick and hands them
+    to a sink in a single call when the player flushes (right before it
+    sleeps). Geometry and key resolution come from the wrapped backend.
+
+    Actions are tuples: ("move", x, y), ("mouse_down", x, y, button),
+    ("mouse_up", x, y, button), ("scroll", x, y, dx, dy), ("key_down", vk),
+    ("key_up", vk).
+    """
+    name = "batched"
+
+    def __init__(self, inner, sink):
+        self.inner = inner
+        self.sink = sink
+        self._pending = []
+        self.calls = 0    # Sink calls made
+        self.actions = 0  # Actions injected through them
+
+    def virtual_screen(self):
+        return self.inner.virtual_screen()
+
+    def resolve_vk(self, key):
+        return self.inner.resolve_vk(key)
+
+    def move(self, x, y):
+        self._pending.append(("move", x, y))
+
+    def mouse_down(self, x, y, button):
+        self._pending.append(("mouse_down", x, y, button))
+
+    def mouse_up(self, x, y, button):
+        self._pending.append(("mouse_up", x, y, button))
+
+    def scroll(self, x, y, dx, dy):
+        self._pending.append(("scroll", x, y, dx, dy))
+
+    def key_down(self, vk):
+        self._pending.append(("key_down", vk))
+
+    def key_up(self, vk):
+        self._pending.append(("key_up", vk))
+
+    def flush(self):
+        """Send everything queued this tick in one sink call"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.sink.send(batch)
+        self.calls += 1
+        self.actions += len(batch)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "actions": self.actions,
+            "actions_per_call": self.actions / self.calls if self.calls else 0.0
+        }
+
+    def reset_stats(self):
+        self.calls = 0
+        self.actions = 0
+
+class ListSink:
+    """Fake sink that keeps every batch with the time it was sent"""
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.batches = []
+
+    def send(self, batch):
+        self.batches.append((self.clock(), list(batch)))
+
+# --- Win32 SendInput ----------------------------------------------------------
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_RIGHTDOWN = 0x0008
+MOUSEEVENTF_RIGHTUP = 0x0010
+MOUSEEVENTF_MIDDLEDOWN = 0x0020
+MOUSEEVENTF_MIDDLEUP = 0x0040
+MOUSEEVENTF_WHEEL = 0x0800
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+MOUSEEVENTF_ABSOLUTE = 0x8000
+KEYEVENTF_KEYUP = 0x0002
+
+DOWN_FLAGS = {BUTTON_LEFT: MOUSEEVENTF_LEFTDOWN, BUTTON_RIGHT: MOUSEEVENTF_RIGHTDOWN, BUTTON_MIDDLE: MOUSEEVENTF_MIDDLEDOWN}
+UP_FLAGS = {BUTTON_LEFT: MOUSEEVENTF_LEFTUP, BUTTON_RIGHT: MOUSEEVENTF_RIGHTUP, BUTTON_MIDDLE: MOUSEEVENTF_MIDDLEUP}
+
+ULONG_PTR = ctypes.c_size_t
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", ctypes.c_long), ("dy", ctypes.c_long), ("mouseData", ctypes.c_ulong),
+                ("dwFlags", ctypes.c_ulong), ("time", ctypes.c_ulong), ("dwExtraInfo", ULONG_PTR)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.c_ushort), ("wScan", ctypes.c_ushort), ("dwFlags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong), ("dwExtraInfo", ULONG_PTR)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", ctypes.c_ulong), ("wParamL", ctypes.c_ushort), ("wParamH", ctypes.c_ushort)]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_ulong), ("u", _INPUTUNION)]
+
+class SendInputSink:
+    """Injects a whole batch with one user32.SendInput call"""
+
+    def __init__(self, geometry):
+        self.left, self.top, self.width, self.height = geometry
+        self._send = ctypes.WinDLL('user32', use_last_error=True).SendInput
+
+    def _mouse(self, flags, x=None, y=None, data=0):
+        item = INPUT(type=INPUT_MOUSE)
+        if x is not None:
+            # Absolute moves use 0..65535 across the whole virtual desktop
+            item.u.mi.dx = int((x - self.left) * 65535 / max(1, self.width - 1))
+            item.u.mi.dy = int((y - self.top) * 65535 / max(1, self.height - 1))
+            flags |= MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
+        item.u.mi.mouseData = data & 0xFFFFFFFF
+        item.u.mi.dwFlags = flags
+        return item
+
+    def _key(self, vk, flags):
+        item = INPUT(type=INPUT_KEYBOARD)
+        item.u.ki.wVk = vk
+        item.u.ki.dwFlags = flags
+        return item
+
+    def send(self, batch):
+        inputs = []
+        for action in batch:
+            kind = action[0]
+            if kind == "move":
+                inputs.append(self._mouse(0, action[1], action[2]))
+            elif kind == "mouse_down" and action[3] in DOWN_FLAGS:
+                inputs.append(self._mouse(DOWN_FLAGS[action[3]]))
+            elif kind == "mouse_up" and action[3] in UP_FLAGS:
+                inputs.append(self._mouse(UP_FLAGS[action[3]]))
+            elif kind == "scroll":
+                inputs.append(self._mouse(MOUSEEVENTF_WHEEL, data=int(action[4] * 120)))
+            elif kind == "key_down":
+                inputs.append(self._key(action[1], 0))
+            elif kind == "key_up":
+                inputs.append(self._key(action[1], KEYEVENTF_KEYUP))
+        if inputs:
+            array = (INPUT * len(inputs))(*inputs)
+            self._send(len(inputs), array, ctypes.sizeof(INPUT))
@@ -1,15 +1,18 @@
 import os
+import sys
 import time
-import dearpygui.dearpygui as dpg
-from recorder import Recorder
-from player import Player
-from config import Config
-import json
+from startup import StartupProfiler, Deferred, load_icon_rgba
+
+# --profile-startup prints where time goes before the first frame, then exits
+profile_startup = "--profile-startup" in sys.argv
+STARTUP_BUDGET = 0.5  # Seconds to first frame we want to stay under
+profiler = StartupProfiler(profile_startup)
+
+with profiler.phase("import dearpygui"):
+    import dearpygui.dearpygui as dpg
+from config import shared_config
+from status_bus import StatusBus
 import traceback
-import sys
-import base64
-from io import BytesIO
-from PIL import Image
 import threading
 
 # Add this at the VERY TOP of main.py (before any other imports)
@@ -23,6 +26,12 @@ if getattr(sys, 'frozen', False):
     if os.path.exists(pywin32_path):
         os.environ['PATH'] = pywin32_path + ';' + os.environ['PATH']
 
+# The playback worker process (see playback_worker.py) is this executable started with a flag
+if "--playback-worker" in sys.argv:
+    import playback_worker
+    playback_worker.serve()
+    sys.exit(0)
+
 # Create error log function
 def log_error():
     error_msg = traceback.format_exc()
@@ -33,13 +42,39 @@ def log_error():
         f.write("\n" + "="*50)
     return error_msg
 
-# Initialize components with error handling
+def create_recorder():
+    from recorder import Recorder  # pynput + numpy
+    return Recorder()
+
+def create_player():
+    from player import Player  # numpy
+    return Player()
+
+def create_playback_worker():
+    from playback_worker import PlaybackWorker
+    worker = PlaybackWorker(config)
+    worker.start()
+    return worker
+
+def playback_engine():
+    """Where playback runs: the worker process if enabled, else this process"""
+    return playback_worker if config.get("playback_process") else player
+
+def create_library():
+    from recording_library import RecordingLibrary
+    return RecordingLibrary(recordings_dir)  # Cached per-recording summaries
+
+# Initialize components with error handling. The heavy ones are built after the
+# first frame (or on first use) so the window shows up without waiting for them
 try:
-    config = Config()
-    recorder = Recorder()
-    player = Player()
+    with profiler.phase("config"):
+        config = shared_config()
+    recorder = Deferred(create_recorder)
+    player = Deferred(create_player)
+    playback_worker = Deferred(create_playback_worker)
     recordings_dir = os.path.join(os.path.dirname(__file__), "recordings")
     os.makedirs(recordings_dir, exist_ok=True)
+    library = Deferred(create_library)
 except Exception:
     error_msg = log_error()
     print("Initialization error. Details in error_log.txt")
@@ -57,6 +92,48 @@ body_font = None
 small_font = None
 is_recording_stopped = False  # Track if recording was stopped to show save dialog
 playback_active = False  # Track if playback is active
+start_offset = 0.0  # Seconds into the recording playback starts from (not saved)
+
+def show_status(tag, text, color=None):
+    """Set a status text from any thread; applied by the UI on the next frame"""
+    status_bus.post(tag, text, color)
+
+def apply_status(tag, text, color=None):
+    dpg.set_value(tag, text)
+    if color is not None:
+        dpg.configure_item(tag, color=color)
+
+# Engine threads (playback, hotkeys, library polling, preloading) post here
+# instead of calling dpg; the render loop drains it once per frame
+status_bus = StatusBus(fallback=apply_status)
+
+def recording_path(name):
+    """Path of an existing recording (binary preferred), or where a new one is saved"""
+    import recording_format
+    for ext in recording_format.RECORDING_EXTENSIONS:
+        path = os.path.join(recordings_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    if config.get("recording_format") == "json":
+        return os.path.join(recordings_dir, name + recording_format.JSON_EXTENSION)
+    return os.path.join(recordings_dir, name + recording_format.BINARY_EXTENSION)
+
+def recover_partial_captures():
+    """Turn captures left behind by a crash or kill into normal recordings"""
+    import capture_log
+    import recording_format
+    recovered = []
+    for path in capture_log.pending_captures():
+        try:
+            recording_data = capture_log.read_segment(path)
+            if recording_data["events"]:
+                name = "recovered_" + os.path.splitext(os.path.basename(path))[0].replace("capture_", "")
+                recording_format.save_binary(recording_path(name), recording_data)
+                recovered.append(name)
+            os.remove(path)
+        except Exception as e:
+            print(f"Warning: Failed to recover {path}: {str(e)}")
+    return recovered
 
 # UI Constants - SIMPLER COLORS
 PRIMARY_COLOR = (60, 120, 200, 255)     # Softer blue
@@ -72,10 +149,9 @@ BORDER_COLOR = (70, 70, 70, 255)         # Border color
 def start_recording():
     global current_recording, is_recording_stopped
     recorder.start()
-    dpg.set_value("rec_status", "● Recording")
-    dpg.configure_item("rec_status", color=ERROR_COLOR)
-    dpg.set_value("rec_counter", "0 events")
-    dpg.set_value("rec_status_desc", "Recording in progress...")
+    show_status("rec_status", "● Recording", ERROR_COLOR)
+    show_status("rec_counter", "0 events")
+    show_status("rec_status_desc", "Recording in progress...")
     is_recording_stopped = False
 
 def save_recording(name):
@@ -85,13 +161,20 @@ def save_recording(name):
     if not name.strip():
         name = f"macro_{int(time.time())}"
     
-    # Save recording
-    filename = os.path.join(recordings_dir, f"{name}.json")
+    # Save recording (a cached plan of an overwritten file is replaced on its next
+    # use, as the file's mtime/size change)
+    filename = recording_path(name)
     count = recorder.save_recording(filename)
     
     # Update UI
     dpg.set_value("rec_counter", f"{count} events saved")
-    dpg.set_value("rec_status_desc", f"Recording saved as '{name}'")
+    stats = recorder.last_save_stats
+    if stats.get("raw_moves"):
+        dpg.set_value("rec_status_desc", f"Recording saved as '{name}' "
+                      f"(mouse path {stats['compression_ratio']:.1f}x smaller, "
+                      f"max error {stats['max_error']:.1f}px)")
+    else:
+        dpg.set_value("rec_status_desc", f"Recording saved as '{name}'")
     
     # Refresh recordings list
     refresh_recordings_list()
@@ -110,6 +193,7 @@ def save_recording(name):
 def cancel_recording():
     """Cancel the recording without saving"""
     global is_recording_stopped
+    recorder.discard_capture()
     dpg.set_value("rec_status_desc", "Recording canceled")
     dpg.hide_item("save_recording_modal")
     is_recording_stopped = False
@@ -126,15 +210,14 @@ def show_save_dialog():
 def stop_recording():
     global is_recording_stopped
     recorder.stop()
-    dpg.set_value("rec_status", "■ Stopped")
-    dpg.configure_item("rec_status", color=TEXT_COLOR)
-    dpg.set_value("rec_status_desc", "Recording stopped - saving...")
+    show_status("rec_status", "■ Stopped", TEXT_COLOR)
+    show_status("rec_status_desc", "Recording stopped - saving...")
     
     # Set flag to show save dialog
     is_recording_stopped = True
     
-    # Show the save dialog
-    show_save_dialog()
+    # Show the save dialog (on the UI thread, this may be the hotkey listener)
+    status_bus.post("save_dialog")
 
 def delete_recording():
     """Delete the selected recording"""
@@ -156,10 +239,11 @@ def confirm_delete_recording():
     if not current_recording:
         return
     
-    # Delete the file
-    filename = os.path.join(recordings_dir, f"{current_recording}.json")
+    # Delete the file and drop its cached plans
+    filename = recording_path(current_recording)
     try:
         os.remove(filename)
+        player.plans.forget(filename)
         dpg.set_value("play_status", f"Deleted '{current_recording}'")
         dpg.configure_item("play_status", color=SUCCESS_COLOR)
         
@@ -186,77 +270,139 @@ def play_recording():
     global current_recording, playback_active
     
     if not current_recording: 
-        dpg.set_value("play_status", "Select a recording first")
-        dpg.configure_item("play_status", color=WARNING_COLOR)
+        show_status("play_status", "Select a recording first", WARNING_COLOR)
         return
     
-    # Get repeat settings
-    repeat_enabled = dpg.get_value("repeat_enabled")
-    repeat_infinite = dpg.get_value("repeat_infinite")
-    repeat_count = dpg.get_value("repeat_count")
+    # Get repeat settings (config mirrors the checkboxes and is safe from the hotkey thread)
+    repeat_enabled = config.get("repeat_enabled")
+    repeat_infinite = config.get("repeat_infinite")
+    repeat_count = config.get("repeat_count")
     
     # Update status
-    dpg.set_value("play_status", "Playing...")
-    dpg.configure_item("play_status", color=SUCCESS_COLOR)
+    show_status("play_status", "Playing...", SUCCESS_COLOR)
+    show_status("play_drift", "")
+    # Armed here, in the order play and stop are requested: a stop while the
+    # plan is still loading cancels this run instead of being lost
+    playback_engine().arm()
     playback_active = True
     
     # Start playback in a separate thread to avoid blocking UI
     threading.Thread(
         target=play_recording_thread, 
-        args=(current_recording, repeat_enabled, repeat_infinite, repeat_count),
+        args=(current_recording, repeat_enabled, repeat_infinite, repeat_count, start_offset),
         daemon=True
     ).start()
 
-def play_recording_thread(current_recording, repeat_enabled, repeat_infinite, repeat_count):
+def play_recording_thread(current_recording, repeat_enabled, repeat_infinite, repeat_count, start_at=0.0):
     """Thread function for playing recordings with repeat functionality"""
     global playback_active
     
-    filename = os.path.join(recordings_dir, f"{current_recording}.json")
+    filename = recording_path(current_recording)
+    engine = playback_engine()
     
     try:
-        with open(filename, 'r') as f:
-            events = json.load(f)
+        # Usually already preloaded when the recording was selected; every repeat reuses the plan
+        plan = player.compile_file(filename)
         
-        # Play once initially
-        player.play(events)
+        # Repeats are looped inside the player on one continuous clock
+        if not repeat_enabled:
+            loops = 1
+        elif repeat_infinite:
+            loops = None
+        else:
+            loops = repeat_count
         
-        # Handle repeat functionality
-        if repeat_enabled:
-            count = 0
-            while (repeat_infinite or count < repeat_count) and playback_active:
-                player.play(events)
-                count += 1
-                time.sleep(0.1)  # Small delay between repeats
-                
-                # Update status with repeat count
-                if not repeat_infinite:
-                    dpg.set_value("play_status", f"Playing... ({count}/{repeat_count})")
+        def on_iteration(stats):
+            drift = stats["drift"]
+            print(f"Iteration {stats['iteration']}: {stats['duration']:.3f}s, "
+                  f"max lag {drift['max_lag'] * 1000:.1f}ms")
+            if loops != 1 and playback_active:
+                total = "" if loops is None else f"/{loops}"
+                show_status("play_status", f"Playing... ({stats['iteration']}{total})", SUCCESS_COLOR)
+            show_status("play_drift", format_drift(drift))
+        
+        if config.get("trace_playback"):
+            from playback_trace import PlaybackTrace
+            engine.trace = PlaybackTrace()
+        else:
+            engine.trace = None
+        
+        if playback_active:  # Not stopped while the plan was loading
+            engine.play(plan, loops=loops, on_iteration=on_iteration, start_at=start_at)
     
     except Exception as e:
-        dpg.set_value("play_status", f"Error: {str(e)}")
-        dpg.configure_item("play_status", color=ERROR_COLOR)
+        show_status("play_status", f"Error: {str(e)}", ERROR_COLOR)
+    
+    # Save the trace next to the recordings; open it in ui.perfetto.dev or chrome://tracing
+    trace = engine.trace
+    if trace:
+        try:
+            traces_dir = os.path.join(os.path.dirname(__file__), "traces")
+            os.makedirs(traces_dir, exist_ok=True)
+            trace_path = os.path.join(traces_dir, f"{current_recording}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+            trace.export(trace_path)
+            print(trace.summary())
+            print(f"Playback trace saved to {trace_path}")
+        except OSError as e:
+            print(f"Warning: Failed to save playback trace: {str(e)}")
+    
+    # Log how far playback fell behind the recorded timeline
+    drift = engine.timing_stats.get("drift")
+    if drift:
+        print(f"Playback drift: max {drift['max_lag'] * 1000:.1f}ms, "
+              f"mean {drift['mean_lag'] * 1000:.2f}ms, {drift['late_events']} late events")
+        show_status("play_drift", format_drift(drift))
+    
+    # Dead time skipped by trim_dead_time / max_idle_gap, in wall-clock seconds at the speed played
+    idle_trim = engine.timing_stats.get("idle_trim")
+    if idle_trim:
+        print(f"Idle trim: {idle_trim['wall_time_saved']:.2f}s saved per iteration "
+              f"({idle_trim['idle_gaps_clamped']} idle gaps clamped, "
+              f"{idle_trim['leading_trimmed']:.2f}s leading dead time)")
     
     # Update status when done
     if playback_active:  # Only if not manually stopped
-        dpg.set_value("play_status", "Playback completed")
-        dpg.configure_item("play_status", color=SUCCESS_COLOR)
+        show_status("play_status", "Playback completed", SUCCESS_COLOR)
     
     playback_active = False
 
 def stop_playback():
     """Stop the current playback"""
     global playback_active
-    player.stop()
-    playback_active = False
-    dpg.set_value("play_status", "Playback stopped")
-    dpg.configure_item("play_status", color=TEXT_COLOR)
+    playback_active = False  # Before stopping, so the play thread doesn't report "completed"
+    playback_engine().stop()
+    show_status("play_status", "Playback stopped", TEXT_COLOR)
+
+def format_drift(drift):
+    return f"Drift: max {drift['max_lag'] * 1000:.1f}ms, {drift['late_events']} late"
+
+def update_live_status():
+    """Per frame: sample the engines' counters (they never post per event)"""
+    active_recorder = recorder.peek()
+    if active_recorder is not None and active_recorder.is_recording:
+        dpg.set_value("rec_counter", f"{active_recorder.event_count} events")
+    # Live drift of in-process playback; the worker process reports it per iteration
+    active_player = player.peek()
+    if playback_active and active_player is not None and active_player.is_playing:
+        dpg.set_value("play_drift", format_drift(active_player.drift.as_dict()))
+
+status_bus.subscribe("save_dialog", lambda: show_save_dialog())
+status_bus.subscribe("recordings_changed", lambda: refresh_recordings_list())
+status_bus.add_poller(update_live_status)
+
+def set_start_offset(sender):
+    """Start playback partway in, e.g. to check the end of a long recording"""
+    global start_offset
+    start_offset = max(0.0, dpg.get_value(sender))
 
 def refresh_recordings_list():
-    """Refresh the list of available recordings"""
-    items = [f[:-5] for f in os.listdir(recordings_dir) if f.endswith('.json')]
+    """Refresh the list of available recordings (only changed files are re-read)"""
+    library.refresh()
+    items = library.names()
     dpg.configure_item("recordings_list", items=items)
     if items:
-        dpg.set_value("recordings_list", items[0])
+        if current_recording not in items:
+            dpg.set_value("recordings_list", items[0])
         set_current_recording("recordings_list")
 
 def set_current_recording(sender):
@@ -264,46 +410,55 @@ def set_current_recording(sender):
     global current_recording
     current_recording = dpg.get_value(sender)
     if current_recording:
-        dpg.set_value("current_recording_label", f"Selected: {current_recording}")
+        label = f"Selected: {current_recording}"
+        summary = library.summary(current_recording)
+        if summary:
+            label += f" ({summary['duration']:.1f}s, {summary['events']} events)"
+        dpg.set_value("current_recording_label", label)
         dpg.configure_item("current_recording_label", color=PRIMARY_COLOR)
+        # Parse and compile in the background so Play starts the first event at once
+        threading.Thread(target=preload_recording, args=(current_recording,), daemon=True).start()
     else:
         dpg.set_value("current_recording_label", "No recording selected")
         dpg.configure_item("current_recording_label", color=WARNING_COLOR)
 
+def preload_recording(name):
+    """Load, validate and cache the plan of a recording ahead of playback"""
+    try:
+        player.compile_file(recording_path(name))
+    except Exception as e:
+        if name == current_recording:
+            show_status("play_status", f"Can't load '{name}': {str(e)}", ERROR_COLOR)
+
 def update_mouse_settings():
     """Update mouse-related settings"""
-    config.set("mouse_acceleration", dpg.get_value("mouse_acceleration"))
-    config.set("micro_jitter", dpg.get_value("micro_jitter"))
-    config.set("path_smoothing", dpg.get_value("path_smoothing"))
+    # One cached update; the player is notified and the file is written once the drag settles
+    config.update({
+        "mouse_acceleration": dpg.get_value("mouse_acceleration"),
+        "micro_jitter": dpg.get_value("micro_jitter"),
+        "path_smoothing": dpg.get_value("path_smoothing")
+    })
     
     # Update UI labels
     dpg.set_value("mouse_acceleration_label", f"{config.get('mouse_acceleration'):.1f}")
     dpg.set_value("micro_jitter_label", f"{config.get('micro_jitter'):.1f}px")
     dpg.set_value("path_smoothing_label", f"{config.get('path_smoothing'):.1f}")
-    
-    # Update player settings
-    player.mouse_acceleration = config.get("mouse_acceleration")
-    player.micro_jitter = config.get("micro_jitter")
-    player.path_smoothing = config.get("path_smoothing")
 
 def update_settings():
     """Update general settings"""
-    config.set("always_on_top", dpg.get_value("always_on_top"))
-    config.set("playback_speed", dpg.get_value("playback_speed"))
-    config.set("jitter_amount", dpg.get_value("jitter_amount"))
-    config.set("hover_delay", dpg.get_value("hover_delay"))
-    config.set("human_like_mouse", dpg.get_value("human_like_mouse"))
-    config.set("repeat_enabled", dpg.get_value("repeat_enabled"))
-    config.set("repeat_infinite", dpg.get_value("repeat_infinite"))
-    config.set("repeat_count", dpg.get_value("repeat_count"))
+    # Player picks the changes up through its config subscription
+    config.update({
+        "always_on_top": dpg.get_value("always_on_top"),
+        "playback_speed": dpg.get_value("playback_speed"),
+        "jitter_amount": dpg.get_value("jitter_amount"),
+        "hover_delay": dpg.get_value("hover_delay"),
+        "human_like_mouse": dpg.get_value("human_like_mouse"),
+        "repeat_enabled": dpg.get_value("repeat_enabled"),
+        "repeat_infinite": dpg.get_value("repeat_infinite"),
+        "repeat_count": dpg.get_value("repeat_count")
+    })
     dpg.set_viewport_always_top(config.get("always_on_top"))
     
-    # Update player settings immediately
-    player.playback_speed = config.get("playback_speed")
-    player.jitter = config.get("jitter_amount")
-    player.hover_delay = config.get("hover_delay")
-    player.human_like_mouse = config.get("human_like_mouse")
-    
     # Update UI to show current values
     dpg.set_value("playback_speed_label", f"{config.get('playback_speed'):.1f}x")
     dpg.set_value("jitter_label", f"{config.get('jitter_amount')}px")
@@ -392,6 +547,10 @@ if not os.path.exists(icon_path) and getattr(sys, 'frozen', False):
     # Try to find icon in bundle
     bundle_dir = sys._MEIPASS
     icon_path = os.path.join(bundle_dir, "app.ico")
+# Next to the exe when frozen: __file__ is then in the one-file build's temp
+# directory, which is deleted on exit
+app_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(__file__)
+icon_cache_path = os.path.join(app_dir, "app_icon.cache")
 
 # Create viewport with proper icon
 dpg.create_viewport(title='Roblox Macro', width=600, height=520,  # Slightly taller for new features
@@ -416,6 +575,7 @@ with dpg.theme() as global_theme:
         dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 10, 10, category=dpg.mvThemeCat_Core)
 
 dpg.bind_theme(global_theme)
+profiler.mark("viewport + theme")
 
 # Create fonts - SMALLER AND MORE COMPACT
 with dpg.font_registry():
@@ -424,76 +584,25 @@ with dpg.font_registry():
     header_font = dpg.add_font("C:/Windows/Fonts/SegoeUI.ttf", 15, tag="header_font")  # Slightly bigger
     body_font = dpg.add_font("C:/Windows/Fonts/SegoeUI.ttf", 14, tag="body_font")      # Slightly bigger
     small_font = dpg.add_font("C:/Windows/Fonts/SegoeUI.ttf", 13, tag="small_font")    # Slightly bigger
+profiler.mark("fonts")
 
 # ================================
 # FIXED ICON LOADING FUNCTION
 # ================================
 def load_app_icon():
-    """Load and register the app icon as a texture"""
+    """Load and register the app icon as a texture (decoded pixels are cached on disk)"""
     global app_icon_texture
     
-    # First try to load from file
-    icon_data = None
-    if os.path.exists("app.ico"):
-        try:
-            # Convert ICO to PNG for Dear PyGui
-            img = Image.open("app.ico")
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Get the largest size available (usually the first one)
-            if hasattr(img, 'info') and 'sizes' in img.info:
-                sizes = img.info['sizes']
-                if sizes:
-                    img = Image.open("app.ico")
-                    img = img.resize(sizes[0])
-            
-            # Convert to bytes
-            img_bytes = BytesIO()
-            img.save(img_bytes, format='PNG')
-            icon_data = img_bytes.getvalue()
-        except Exception as e:
-            print(f"Warning: Failed to load app.ico directly: {str(e)}")
-    
-    # If file loading failed or we're in a bundle, use embedded fallback
-    if icon_data is None:
-        try:
-            # Embedded 32x32 icon as base64
-            fallback_icon = """
-            iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAAAVklEQVRYR+2W0QqDMBBE
-            /w89epIIgqJ48O7//0h3k01jNlEUELx7m8xkmBBIIIAkTQIhBGme52ieZ1RVhTzPkOY5
-            0jzHNE2I4xhhGCIvCqR5jjRPMU0TqqqCMAwRhiHCMEQYBgjDAOEf4P8J+HcC/h34/QMM
-            8NhiHY7DRwAAAABJRU5ErkJggg==
-            """
-            icon_data = base64.b64decode(fallback_icon.strip())
-        except Exception as e:
-            print(f"Error: Failed to load fallback icon: {str(e)}")
-            return None
+    try:
+        if os.path.exists(icon_path):
+            width, height, data = load_icon_rgba(icon_path, icon_cache_path)
+        else:
+            width, height, data = decode_fallback_icon()
+    except Exception as e:
+        print(f"Error: Failed to load icon: {str(e)}")
+        return None
     
     try:
-        # Convert PNG bytes to texture - CORRECTED FOR NEWER DEAR PYGUI
-        data = None
-        width = 0
-        height = 0
-        channels = 0
-        
-        try:
-            # Try using the built-in load_image function
-            width, height, channels, data = dpg.load_image(BytesIO(icon_data))
-        except:
-            # Fallback: manual conversion
-            img = Image.open(BytesIO(icon_data))
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            width, height = img.size
-            channels = 4
-            data = img.tobytes()
-        
-        if data is None:
-            print("Error: Failed to get image data")
-            return None
-        
         with dpg.texture_registry():
             app_icon_texture = dpg.add_static_texture(
                 width, height, data, 
@@ -505,6 +614,20 @@ def load_app_icon():
         print(f"Error: Failed to register icon texture: {str(e)}")
         return None
 
+def decode_fallback_icon():
+    """Embedded 32x32 icon, used when app.ico is missing"""
+    import base64
+    from io import BytesIO
+    from PIL import Image
+    fallback_icon = """
+    iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAAAVklEQVRYR+2W0QqDMBBE
+    /w89epIIgqJ48O7//0h3k01jNlEUELx7m8xkmBBIIIAkTQIhBGme52ieZ1RVhTzPkOY5
+    0jzHNE2I4xhhGCIvCqR5jjRPMU0TqqqCMAwRhiHCMEQYBgjDAOEf4P8J+HcC/h34/QMM
+    8NhiHY7DRwAAAABJRU5ErkJggg==
+    """
+    img = Image.open(BytesIO(base64.b64decode("".join(fallback_icon.split())))).convert('RGBA')
+    return img.size[0], img.size[1], [value / 255.0 for value in img.tobytes()]
+
 # ================================
 # MAIN WINDOW CREATION
 # ================================
@@ -599,6 +722,10 @@ def create_main_window():
                                      width=60,
                                      callback=update_settings)
                 
+                dpg.add_input_float(label="Start at (s)", tag="start_offset", default_value=0.0,
+                                    min_value=0.0, min_clamped=True, step=1.0, format="%.1f",
+                                    width=100, callback=set_start_offset)
+                
                 dpg.add_spacer(height=5)
                 # Playback Status (using horizontal group instead of add_same_line)
                 with dpg.group(horizontal=True):
@@ -606,6 +733,8 @@ def create_main_window():
                     dpg.bind_item_font(dpg.last_item(), small_font)
                     dpg.add_text("Ready to play", tag="play_status", color=TEXT_COLOR)
                     dpg.bind_item_font(dpg.last_item(), body_font)  # Using larger font
+                dpg.add_text("", tag="play_drift", color=SECONDARY_COLOR)
+                dpg.bind_item_font(dpg.last_item(), small_font)
                 
                 dpg.add_spacer(height=5)
                 # Delete button
@@ -815,15 +944,60 @@ def create_main_window():
                               callback=cancel_delete_recording)
 
 # Final UI Setup
+def finish_startup():
+    """Work that can wait until the window is on screen"""
+    with profiler.phase("recover captures"):
+        recovered = recover_partial_captures()
+    with profiler.phase("recordings list"):
+        refresh_recordings_list()
+    # Pick up recordings added, replaced or deleted outside the app
+    library.start_polling(on_change=lambda *changes: status_bus.post("recordings_changed"))
+    if recovered:
+        show_status("rec_status_desc", f"Recovered {len(recovered)} unsaved recording(s)")
+    if profile_startup:
+        # Measure building them here instead of in the background
+        with profiler.phase("player"):
+            player.get()
+        with profiler.phase("recorder"):
+            recorder.get()
+        profiler.report("After first frame")
+        dpg.stop_dearpygui()
+    else:
+        player.preload()
+        recorder.preload()
+        if config.get("playback_process"):
+            playback_worker.preload()
+
+def on_first_frame():
+    profiler.mark("first frame")
+    if profile_startup:
+        within_budget = profiler.report("Time to first frame", budget=STARTUP_BUDGET)
+        if not within_budget:
+            startup_over_budget.set()
+    finish_startup()
+
+startup_over_budget = threading.Event()
+
 try:
     # Correct way to set default font in newer Dear PyGui versions
     dpg.bind_font(title_font)
-    create_main_window()
-    dpg.setup_dearpygui()
-    dpg.set_viewport_always_top(config.get("always_on_top"))
-    dpg.set_viewport_resize_callback(lambda: dpg.set_item_pos("main_window", [0,0]))
-    dpg.show_viewport()
-    dpg.set_primary_window("main_window", True)
-    dpg.start_dearpygui()
+    with profiler.phase("create window"):
+        create_main_window()
+    
+    with profiler.phase("setup dearpygui"):
+        dpg.setup_dearpygui()
+        dpg.set_viewport_always_top(config.get("always_on_top"))
+        dpg.set_viewport_resize_callback(lambda: dpg.set_item_pos("main_window", [0,0]))
+        dpg.show_viewport()
+        dpg.set_primary_window("main_window", True)
+    dpg.set_frame_callback(1, on_first_frame)
+    # Manual render loop so engine status is drained exactly once per frame
+    while dpg.is_dearpygui_running():
+        status_bus.dispatch()
+        dpg.render_dearpygui_frame()
 finally:
-    dpg.destroy_context()
\ No newline at end of file
+    dpg.destroy_context()
+    config.flush()
+
+if startup_over_budget.is_set():
+    sys.exit(1)
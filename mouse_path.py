@@ -0,0 +1,89 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# Batched kernels for human-like cursor paths. Each call produces the whole
+# point or timing array at once from a caller-owned np.random.Generator.
+# Everything that only depends on the number of points is computed once and
+# cached, so a move costs a couple of small array ops.
+
+@lru_cache(maxsize=64)
+def _bezier_basis(num_points):
+    """Quadratic Bernstein weights, shape (num_points + 1, 3)"""
+    t = np.linspace(0.0, 1.0, num_points + 1)
+    u = 1.0 - t
+    basis = np.stack([u * u, 2.0 * u * t, t * t], axis=1)
+    basis.setflags(write=False)
+    return basis
+
+@lru_cache(maxsize=128)
+def _timing_profile(num_points, gaming_mode):
+    """Fraction of the total move time spent on each of the num_points - 1 segments"""
+    t = np.arange(num_points - 1) / (num_points - 2)
+    if gaming_mode:
+        # More linear for gaming (direct movements)
+        progress = t
+    else:
+        # Ease in for the first half, ease out for the second
+        shifted = t - 1.0
+        progress = np.where(t < 0.5, 4.0 * t ** 3, 4.0 * shifted ** 3 + 1.0)
+    profile = np.diff(progress, prepend=0.0)
+    profile.setflags(write=False)
+    return profile
+
+@lru_cache(maxsize=64)
+def _jitter_falloff(count):
+    """Jitter gets smaller toward the end of the path"""
+    falloff = 1.0 - np.arange(count) / count * 0.7
+    falloff.setflags(write=False)
+    return falloff
+
+def bezier_path(rng, x0, y0, x1, y1, num_points, gaming_mode=False):
+    """Quadratic Bezier curve from (x0, y0) to (x1, y1) as a (num_points + 1, 2) array"""
+    dx = x1 - x0
+    dy = y1 - y0
+    distance = math.hypot(dx, dy)
+    # Max deviation of the control point (5-15% of distance, less for gaming)
+    max_deviation = min(distance * (0.05 if gaming_mode else 0.15), 0.2)  # Cap at 20% of screen
+    deviation = max_deviation * rng.uniform(-1.0, 1.0)
+
+    # Control point pushed perpendicular to the straight line
+    angle = math.atan2(dy, dx) - math.pi / 2
+    cx = min(1.0, max(0.0, (x0 + x1) / 2 + deviation * math.cos(angle)))
+    cy = min(1.0, max(0.0, (y0 + y1) / 2 + deviation * math.sin(angle)))
+
+    control = np.array([[x0, y0], [cx, cy], [x1, y1]])
+    return _bezier_basis(num_points) @ control
+
+def micro_jitter(rng, points, micro_jitter_amount, gaming_mode=False):
+    """Add subtle noise to a path, fading toward the end and never exceeding
+    30% of the local segment length"""
+    if micro_jitter_amount <= 0:
+        return points
+    count = len(points)
+    intensity = _jitter_falloff(count) * (micro_jitter_amount * (0.05 if gaming_mode else 0.1))
+
+    # Cap by the step to the previous point so jitter can't cause wild movement
+    steps = np.diff(points, axis=0)
+    np.minimum(intensity[1:], np.sqrt((steps * steps).sum(axis=1)) * 0.3, out=intensity[1:])
+
+    noise = rng.uniform(-1.0, 1.0, size=(count, 2))
+    noise *= intensity[:, None]
+    noise += points
+    return np.clip(noise, 0.0, 1.0, out=noise)
+
+def human_timing(rng, num_points, distance, gaming_mode=False):
+    """Per-segment sleep times (num_points - 1 values) with an ease-in-out profile"""
+    # Time to move 1% of screen, 40% faster for gaming
+    total_time = max(0.03, distance * 0.08)
+    if gaming_mode:
+        total_time *= 0.6
+
+    # Natural variation (less for gaming)
+    variation = 0.02 * (0.3 if gaming_mode else 1.0)
+    segments = rng.uniform(1.0 - variation, 1.0 + variation, size=num_points - 1)
+    segments *= _timing_profile(num_points, gaming_mode)
+    segments *= total_time
+    # Minimum time per segment (faster for gaming)
+    return np.maximum(segments, 0.003 if gaming_mode else 0.005, out=segments)
@@ -0,0 +1,91 @@
+import math
+
+class StreamingSimplifier:
+    """Online simplification of a timed cursor path.
+
+    Points are fed one at a time. A point is only kept when dropping it would
+    let the replayed path (linear interpolation in time between kept points)
+    stray more than `tolerance` from any raw sample, or when the gap since the
+    last kept point would exceed `max_interval` seconds. This is the
+    synchronized-distance variant of an opening-window Douglas-Peucker, so both
+    the shape and the timing of the path stay within bounds.
+    """
+
+    def __init__(self, tolerance=3.0, max_interval=0.25, max_window=128):
+        self.tolerance = tolerance        # Max reconstruction error (input units, e.g. pixels)
+        self.max_interval = max_interval  # Max seconds between kept points
+        self.max_window = max_window      # Bounds the work per point on long straight drags
+        self.reset()
+
+    def reset(self):
+        self._anchor = None   # Last kept point (x, y, t)
+        self._window = []     # Raw points after the anchor, not yet decided
+        self._window_error = 0.0  # Error of dropping everything but the window's last point
+        self.raw_points = 0
+        self.kept_points = 0
+        self.max_error = 0.0
+
+    def add(self, x, y, t):
+        """Feed a raw sample, returns the points that became final (0 or 1)"""
+        self.raw_points += 1
+        point = (x, y, t)
+        if self._anchor is None:
+            self._anchor = point
+            return [self._keep(point, 0.0)]
+
+        if self._window and (t - self._anchor[2] > self.max_interval
+                             or len(self._window) >= self.max_window):
+            return self._advance(point)
+
+        error = self._segment_error(self._anchor, point, self._window)
+        if error > self.tolerance and self._window:
+            return self._advance(point)
+
+        self._window.append(point)
+        self._window_error = error
+        return []
+
+    def flush(self):
+        """Finalize the pending tail of the path (call before any non-move event)"""
+        if not self._window:
+            return []
+        last = self._window[-1]
+        kept = self._keep(last, self._window_error)
+        self._anchor = last
+        self._window = []
+        self._window_error = 0.0
+        return [kept]
+
+    def _advance(self, point):
+        # The window's last point becomes the new anchor; the new point starts a fresh window
+        kept = self.flush()
+        self._window = [point]
+        self._window_error = 0.0
+        return kept
+
+    def _keep(self, point, error):
+        self.kept_points += 1
+        self.max_error = max(self.max_error, error)
+        return point
+
+    @staticmethod
+    def _segment_error(start, end, points):
+        """Largest distance between each point and where the segment says the cursor is at that time"""
+        x0, y0, t0 = start
+        x1, y1, t1 = end
+        span = t1 - t0
+        worst = 0.0
+        for x, y, t in points:
+            f = (t - t0) / span if span > 0 else 1.0
+            ex = x0 + (x1 - x0) * f - x
+            ey = y0 + (y1 - y0) * f - y
+            worst = max(worst, math.sqrt(ex * ex + ey * ey))
+        return worst
+
+    def stats(self):
+        return {
+            "raw_moves": self.raw_points,
+            "kept_moves": self.kept_points,
+            "compression_ratio": self.raw_points / self.kept_points if self.kept_points else 1.0,
+            "max_error": self.max_error
+        }
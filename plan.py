@@ -0,0 +1,292 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import recording_format
+from recording_format import ColumnarRecording, EV_MOVE, EV_CLICK, EV_SCROLL, EV_KEY_HOLD
+
+ROW_BYTES = 200  # Rough size of one cached Python row tuple (8 boxed values)
+
+# Opcodes of a compiled playback plan
+OP_MOVE = 0
+OP_MOUSE_DOWN = 1
+OP_MOUSE_UP = 2
+OP_SCROLL = 3
+OP_KEY_PRESS = 4
+
+BUTTON_IDS = {"left": 1, "right": 2, "middle": 3}
+
+class PlaybackPlan:
+    """A recording compiled once into flat arrays for a given screen geometry.
+
+    Rows are actionable events only: each key hold is one OP_KEY_PRESS row
+    whose value is the release time.
+    """
+
+    def __init__(self, times, ops, rel_x, rel_y, abs_x, abs_y, codes, values,
+                 geometry, gaming_mode=None):
+        self.times = times      # float64 recorded timestamps (seconds)
+        self.ops = ops          # uint8 opcodes
+        self.rel_x = rel_x      # float64 clamped relative coordinates
+        self.rel_y = rel_y
+        self.abs_x = abs_x      # int32 absolute pixels on the target geometry
+        self.abs_y = abs_y
+        self.codes = codes      # int32 VK code (keys) or button id (clicks)
+        self.values = values    # float64 release time (keys) or wheel delta (scroll)
+        self.geometry = geometry  # (left, top, width, height)
+        self.gaming_mode = gaming_mode
+        self.trim_report = None  # Set on plans produced by idle_trim.compress_idle
+        self.derived = {}  # Transformed versions of this plan, keyed by their settings
+        self.seek_index = None  # seek.SeekIndex, built on the first seek into this plan
+        self.hold_index = None  # holds.HoldIndex, built on first use
+        self._rows = None
+
+    def __len__(self):
+        return len(self.ops)
+
+    @property
+    def duration(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def end_time(self):
+        """When playback of the plan is over: the last row, or the last key
+        release if a hold outlasts it (keys never released don't count)"""
+        end = self.duration
+        releases = self.values[self.ops == OP_KEY_PRESS]
+        releases = releases[~np.isnan(releases)]
+        if len(releases):
+            end = max(end, float(releases.max()))
+        return end
+    
+    @property
+    def nbytes(self):
+        """Approximate memory held by the plan, including its cached rows"""
+        arrays = (self.times, self.ops, self.rel_x, self.rel_y, self.abs_x, self.abs_y, self.codes, self.values)
+        size = sum(array.nbytes for array in arrays)
+        if self._rows is not None:
+            size += len(self._rows) * ROW_BYTES
+        for index in (self.seek_index, self.hold_index):
+            if index is not None:
+                size += index.nbytes
+        return size + sum(plan.nbytes for plan in self.derived.values())
+
+    def __getstate__(self):
+        # Sent to the playback worker as arrays only; rows and derived plans are rebuilt there
+        state = self.__dict__.copy()
+        state["_rows"] = None
+        state["derived"] = {}
+        state["seek_index"] = None
+        state["hold_index"] = None
+        return state
+
+    def rows(self):
+        """Plain Python rows for the playback loop, built once per plan"""
+        if self._rows is None:
+            self._rows = list(zip(
+                self.times.tolist(), self.ops.tolist(),
+                self.rel_x.tolist(), self.rel_y.tolist(),
+                self.abs_x.tolist(), self.abs_y.tolist(),
+                self.codes.tolist(), self.values.tolist()
+            ))
+        return self._rows
+
+def compile_recording(recording_data, geometry, resolve_vk):
+    """Compile recording_data into a PlaybackPlan for geometry.
+
+    resolve_vk maps a recorded key name to its virtual key code (0 if unknown).
+    """
+    if isinstance(recording_data, ColumnarRecording):
+        return _compile_columns(recording_data, geometry, resolve_vk)
+    events = recording_format.normalize_holds(recording_data.get("events", []))
+    left, top, width, height = geometry
+
+    vk_cache = {}
+    times, ops, xs, ys, codes, values = [], [], [], [], [], []
+    for event in events:
+        kind = event[0]
+        if kind == "move":
+            op, x, y, code, value = OP_MOVE, event[1], event[2], 0, 0.0
+        elif kind == "click":
+            code = BUTTON_IDS.get(event[3], 0)
+            if not code:
+                continue
+            op = OP_MOUSE_DOWN if event[4] else OP_MOUSE_UP
+            x, y, value = event[1], event[2], 0.0
+        elif kind == "scroll":
+            op, x, y, code, value = OP_SCROLL, event[1], event[2], 0, event[4]
+        elif kind == "key_hold":
+            key = event[1].lower()
+            if key not in vk_cache:
+                vk_cache[key] = resolve_vk(key)
+            code = vk_cache[key]
+            if not code:
+                continue
+            # Released at start + duration, never if the recording ended first
+            value = np.nan if event[2] is None else event[-1] + event[2]
+            op, x, y = OP_KEY_PRESS, 0.0, 0.0
+        else:
+            continue
+        times.append(event[-1])
+        ops.append(op)
+        xs.append(x)
+        ys.append(y)
+        codes.append(code)
+        values.append(value)
+
+    rel_x = np.clip(np.asarray(xs, dtype=np.float64), 0.0, 1.0)
+    rel_y = np.clip(np.asarray(ys, dtype=np.float64), 0.0, 1.0)
+    abs_x = (left + rel_x * width).astype(np.int32)
+    abs_y = (top + rel_y * height).astype(np.int32)
+    return PlaybackPlan(
+        np.asarray(times, dtype=np.float64),
+        np.asarray(ops, dtype=np.uint8),
+        rel_x, rel_y, abs_x, abs_y,
+        np.asarray(codes, dtype=np.int32),
+        np.asarray(values, dtype=np.float64),
+        tuple(geometry),
+        recording_data.get("gaming_mode")
+    )
+
+def _compile_columns(recording, geometry, resolve_vk):
+    """Vectorized compile straight from the columns of a binary recording"""
+    cols = recording.columns
+    left, top, width, height = geometry
+    kinds = np.asarray(cols["op"])
+    times = np.asarray(cols["time"], dtype=np.float64)
+    codes = np.asarray(cols["code"], dtype=np.int64)
+    extra = np.asarray(cols["extra"], dtype=np.float64)
+
+    # Lookup tables over the names table: VK codes for keys, ids for buttons
+    names = [name.lower() for name in recording.names]
+    vk_lookup = np.array([resolve_vk(name) for name in names] or [0], dtype=np.int32)
+    button_lookup = np.array([BUTTON_IDS.get(name, 0) for name in names] or [0], dtype=np.int32)
+
+    ops = np.full(len(kinds), 255, dtype=np.uint8)  # 255 = dropped row
+    out_codes = np.zeros(len(kinds), dtype=np.int32)
+    values = np.zeros(len(kinds), dtype=np.float64)
+
+    ops[kinds == EV_MOVE] = OP_MOVE
+
+    clicks = kinds == EV_CLICK
+    out_codes[clicks] = button_lookup[codes[clicks]]
+    ops[clicks & (extra != 0)] = OP_MOUSE_DOWN
+    ops[clicks & (extra == 0)] = OP_MOUSE_UP
+    ops[clicks & (out_codes == 0)] = 255
+
+    scrolls = kinds == EV_SCROLL
+    ops[scrolls] = OP_SCROLL
+    values[scrolls] = extra[scrolls]
+
+    holds = kinds == EV_KEY_HOLD
+    out_codes[holds] = vk_lookup[codes[holds]]
+    ops[holds & (out_codes != 0)] = OP_KEY_PRESS
+    values[holds] = times[holds] + extra[holds]  # NaN duration -> never released
+
+    keep = ops != 255
+    rel_x = np.clip(np.asarray(cols["x"], dtype=np.float64)[keep], 0.0, 1.0)
+    rel_y = np.clip(np.asarray(cols["y"], dtype=np.float64)[keep], 0.0, 1.0)
+    rel_x[ops[keep] == OP_KEY_PRESS] = 0.0
+    rel_y[ops[keep] == OP_KEY_PRESS] = 0.0
+    return PlaybackPlan(
+        times[keep], ops[keep], rel_x, rel_y,
+        (left + rel_x * width).astype(np.int32),
+        (top + rel_y * height).astype(np.int32),
+        out_codes[keep], values[keep],
+        tuple(geometry),
+        recording.gaming_mode
+    )
+
+class PlanCache:
+    """Compiled plans keyed by recording and screen geometry.
+
+    Least recently used plans are evicted once the cache holds more than
+    `max_bytes` (or `max_entries` plans). Safe to use from several threads:
+    loading and compiling happen outside the cache lock, so a large preload
+    only makes callers for the same plan wait for it.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._plans = OrderedDict()  # cache_key -> (pinned recording or None, plan)
+        self._building = {}  # cache_key -> Event set once its compile is done
+        self._lock = threading.Lock()
+
+    def get(self, recording_data, geometry, resolve_vk, key=None):
+        # Without an explicit key the recording object itself is the identity;
+        # the entry keeps a reference to it so the id can't be reused. A
+        # caller's key identifies the recording without keeping it alive.
+        cache_key = (key if key is not None else id(recording_data), tuple(geometry))
+        return self._fetch(
+            cache_key,
+            lambda: (recording_data if key is None else None,
+                     compile_recording(recording_data, geometry, resolve_vk)),
+            lambda entry: key is not None or entry[0] is recording_data)
+
+    def get_file(self, path, geometry, resolve_vk):
+        """Plan for a recording file, loaded and compiled only if the file
+        changed (mtime/size) since it was cached. Rows are built up front so
+        playback can start straight away."""
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            # Older versions of this file can never be hit again
+            self._drop(lambda source: source[0] == path and source[1] != version)
+
+        def build():
+            plan = compile_recording(recording_format.load_recording(path), geometry, resolve_vk)
+            plan.rows()
+            return None, plan
+        return self._fetch(((path, version), tuple(geometry)), build)
+
+    def forget(self, path):
+        """Drop every cached plan of a recording file (e.g. once it is deleted)"""
+        with self._lock:
+            self._drop(lambda source: source[0] == path)
+
+    def _fetch(self, cache_key, build, valid=None):
+        """Cached plan for cache_key, or build() one without holding the lock.
+        Concurrent callers for the same key wait for that build instead of
+        repeating it; if it fails, the next of them tries again."""
+        while True:
+            with self._lock:
+                entry = self._plans.get(cache_key)
+                if entry is not None and (valid is None or valid(entry)):
+                    self._plans.move_to_end(cache_key)
+                    return entry[1]
+                done = self._building.get(cache_key)
+                if done is None:
+                    done = self._building[cache_key] = threading.Event()
+                    break
+            done.wait()
+        try:
+            entry = build()
+            with self._lock:
+                self._store(cache_key, entry)
+            return entry[1]
+        finally:
+            with self._lock:
+                del self._building[cache_key]
+            done.set()
+
+    def _drop(self, matches):
+        # File entries are keyed ((path, version), geometry); call with the lock held
+        for cache_key in [k for k in self._plans if isinstance(k[0], tuple) and matches(k[0])]:
+            del self._plans[cache_key]
+
+    def _store(self, cache_key, entry):
+        self._plans[cache_key] = entry
+        self._plans.move_to_end(cache_key)
+        while len(self._plans) > 1 and (len(self._plans) > self.max_entries or self.nbytes > self.max_bytes):
+            self._plans.popitem(last=False)
+
+    @property
+    def nbytes(self):
+        return sum(plan.nbytes for _, plan in self._plans.values())
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
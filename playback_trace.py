@@ -0,0 +1,174 @@
+import json
+
+import numpy as np
+
+from input_backend import InputBackend
+from plan import OP_MOVE, OP_MOUSE_DOWN, OP_MOUSE_UP, OP_SCROLL, OP_KEY_PRESS
+
+OP_NAMES = {
+    OP_MOVE: "move",
+    OP_MOUSE_DOWN: "mouse_down",
+    OP_MOUSE_UP: "mouse_up",
+    OP_SCROLL: "scroll",
+    OP_KEY_PRESS: "key_press"
+}
+
+class PlaybackTrace:
+    """Opt-in record of where playback time goes.
+
+    Assign one to `Player.trace` before `play`; the player then records every
+    event (scheduled vs actual start, handler time) and spans for waits, path
+    generation, settle delays and backend calls. Times are timer seconds.
+    With `Player.trace` left at None the playback loop only pays a few
+    attribute checks.
+    """
+
+    def __init__(self, max_spans=1_000_000):
+        self.max_spans = max_spans
+        self.events = []  # (op, scheduled, started, ended)
+        self.spans = []   # (name, category, start, end)
+        self.dropped = 0
+
+    def event(self, op, scheduled, started, ended):
+        self.events.append((op, scheduled, started, ended))
+
+    def span(self, name, category, start, end):
+        if len(self.spans) < self.max_spans:
+            self.spans.append((name, category, start, end))
+        else:
+            self.dropped += 1
+
+    def clear(self):
+        self.events = []
+        self.spans = []
+        self.dropped = 0
+
+    # --- Analysis -----------------------------------------------------------
+
+    def handler_latency(self):
+        """op name -> array of handler durations (seconds)"""
+        by_op = {}
+        for op, _, started, ended in self.events:
+            by_op.setdefault(OP_NAMES.get(op, str(op)), []).append(ended - started)
+        return {name: np.asarray(values) for name, values in by_op.items()}
+
+    def lateness(self):
+        """op name -> array of actual minus scheduled start (seconds)"""
+        by_op = {}
+        for op, scheduled, started, _ in self.events:
+            by_op.setdefault(OP_NAMES.get(op, str(op)), []).append(started - scheduled)
+        return {name: np.asarray(values) for name, values in by_op.items()}
+
+    def histograms(self):
+        """op name -> {bucket upper bound in microseconds (powers of 2): count} of handler time"""
+        result = {}
+        for name, values in self.handler_latency().items():
+            micros = np.maximum(values * 1e6, 1.0)
+            buckets = np.ceil(np.log2(micros)).astype(int)
+            counts = np.bincount(buckets)
+            result[name] = {2 ** b: int(c) for b, c in enumerate(counts.tolist()) if c}
+        return result
+
+    def phase_totals(self):
+        """span name -> total seconds"""
+        totals = {}
+        for name, _, start, end in self.spans:
+            totals[name] = totals.get(name, 0.0) + (end - start)
+        return totals
+
+    def summary(self):
+        latency = self.handler_latency()
+        lateness = self.lateness()
+        lines = [f"{'event':<12}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}{'late p50':>10}{'late p99':>10}  (ms)"]
+        for name in sorted(latency):
+            values, late = latency[name] * 1e3, lateness[name] * 1e3
+            lines.append(f"{name:<12}{len(values):>7}"
+                         f"{np.percentile(values, 50):>10.3f}{np.percentile(values, 90):>10.3f}"
+                         f"{np.percentile(values, 99):>10.3f}{values.max():>10.3f}"
+                         f"{np.percentile(late, 50):>10.3f}{np.percentile(late, 99):>10.3f}")
+        totals = self.phase_totals()
+        if totals:
+            lines.append("")
+            lines.append(f"{'phase':<24}{'total ms':>12}")
+            for name, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+                lines.append(f"{name:<24}{seconds * 1e3:>12.1f}")
+        if self.dropped:
+            lines.append(f"({self.dropped} spans dropped, max_spans={self.max_spans})")
+        return "\n".join(lines)
+
+    # --- Export -------------------------------------------------------------
+
+    def to_chrome_trace(self):
+        """Trace-event JSON (chrome://tracing, ui.perfetto.dev)"""
+        if not self.events and not self.spans:
+            return {"traceEvents": []}
+        origin = min([e[1] for e in self.events] + [e[2] for e in self.events] + [s[2] for s in self.spans])
+        us = lambda t: (t - origin) * 1e6
+        trace = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "playback"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "events"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "phases"}}
+        ]
+        for op, scheduled, started, ended in self.events:
+            name = OP_NAMES.get(op, str(op))
+            trace.append({"name": name, "cat": "event", "ph": "X", "pid": 1, "tid": 1,
+                          "ts": us(started), "dur": max(us(ended) - us(started), 0.0),
+                          "args": {"scheduled_us": us(scheduled), "lag_us": (started - scheduled) * 1e6}})
+            trace.append({"name": name + " scheduled", "cat": "schedule", "ph": "i", "s": "t",
+                          "pid": 1, "tid": 1, "ts": us(scheduled)})
+        for name, category, start, end in self.spans:
+            trace.append({"name": name, "cat": category, "ph": "X", "pid": 1, "tid": 2,
+                          "ts": us(start), "dur": max(us(end) - us(start), 0.0)})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+class TracingBackend(InputBackend):
+    """Wraps a backend and records a span per call (installed by Player while tracing)"""
+
+    def __init__(self, inner, trace, now):
+        self.inner = inner
+        self.trace = trace
+        self.now = now
+        self.name = inner.name
+
+    def _timed(self, name, method, *args):
+        start = self.now()
+        result = method(*args)
+        self.trace.span(name, "inject", start, self.now())
+        return result
+
+    def virtual_screen(self):
+        return self.inner.virtual_screen()
+
+    def resolve_vk(self, key):
+        return self.inner.resolve_vk(key)
+
+    def move(self, x, y):
+        self._timed("inject move", self.inner.move, x, y)
+
+    def mouse_down(self, x, y, button):
+        self._timed("inject mouse_down", self.inner.mouse_down, x, y, button)
+
+    def mouse_up(self, x, y, button):
+        self._timed("inject mouse_up", self.inner.mouse_up, x, y, button)
+
+    def scroll(self, x, y, dx, dy):
+        self._timed("inject scroll", self.inner.scroll, x, y, dx, dy)
+
+    def key_down(self, vk):
+        self._timed("inject key_down", self.inner.key_down, vk)
+
+    def key_up(self, vk):
+        self._timed("inject key_up", self.inner.key_up, vk)
+
+    def flush(self):
+        self._timed("inject flush", self.inner.flush)
+
+    def stats(self):
+        return self.inner.stats()
+
+    def reset_stats(self):
+        self.inner.reset_stats()
@@ -0,0 +1,241 @@
+import os
+import sys
+import ctypes
+import pickle
+import threading
+import subprocess
+
+from config import Config
+from player import Player, STOP_TIMEOUT
+from playback_trace import PlaybackTrace
+
+# Windows priority constants
+HIGH_PRIORITY_CLASS = 0x00000080
+THREAD_PRIORITY_HIGHEST = 2
+
+# Messages are pickled tuples over the worker's stdin/stdout.
+# UI -> worker: ("play", plan, loops, loop_start, loop_end, start_at, traced), ("stop",),
+#               ("speed", speed), ("config", {key: value}), ("quit",)
+# Worker -> UI: ("ready", priority), ("iteration", stats),
+#               ("finished", timing_stats, trace, error)
+
+def worker_command():
+    """Command line that starts a worker process"""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--playback-worker"]  # main.py hands the flag to serve()
+    return [sys.executable, os.path.abspath(__file__)]
+
+def raise_priority():
+    """Raise this process's scheduling priority where the OS allows; returns what was set"""
+    if sys.platform == "win32":
+        try:
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+            kernel32.SetPriorityClass.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
+            if kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), HIGH_PRIORITY_CLASS):
+                return "high"
+        except (OSError, AttributeError):
+            pass
+        return "normal"
+    # Threads started afterwards inherit the nice value; lowering it needs privileges
+    for nice in (-10, -5):
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+            return f"nice {nice}"
+        except (OSError, AttributeError):
+            pass
+    return "normal"
+
+def raise_thread_priority():
+    """Windows only: run the calling thread above the process's other threads"""
+    if sys.platform == "win32":
+        try:
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            kernel32.GetCurrentThread.restype = ctypes.c_void_p
+            kernel32.SetThreadPriority.argtypes = [ctypes.c_void_p, ctypes.c_int]
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_HIGHEST)
+        except (OSError, AttributeError):
+            pass
+
+class _Channel:
+    """Pickled messages over a pair of binary streams, safe to send from several threads"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        with self._send_lock:
+            pickle.dump(message, self.writer, protocol=pickle.HIGHEST_PROTOCOL)
+            self.writer.flush()
+
+    def recv(self):
+        """Next message; raises EOFError once the other side is gone"""
+        return pickle.load(self.reader)
+
+def serve(reader=None, writer=None):
+    """Worker process main loop: plays what the UI process sends until it closes the pipe"""
+    if reader is None:
+        reader, writer = sys.stdin.buffer, sys.stdout.buffer
+        # stdout carries messages; stray prints go to stderr
+        sys.stdout = sys.stderr if sys.stderr is not None else open(os.devnull, "w")
+    channel = _Channel(reader, writer)
+    priority = raise_priority()
+    config = Config(persist=False)  # Kept current by the UI process, never written here
+    player = Player(config=config)
+
+    def run(plan, loops, loop_start, loop_end, start_at, traced):
+        raise_thread_priority()
+        player.trace = PlaybackTrace() if traced else None
+        error = None
+        try:
+            player.play(plan, loops=loops, loop_start=loop_start, loop_end=loop_end, start_at=start_at,
+                        on_iteration=lambda stats: channel.send(("iteration", stats)))
+        except Exception as e:
+            error = str(e)
+        channel.send(("finished", player.timing_stats, player.trace, error))
+
+    channel.send(("ready", priority))
+    while True:
+        try:
+            message = channel.recv()
+        except (EOFError, OSError, pickle.UnpicklingError):
+            break
+        kind = message[0]
+        if kind == "play":
+            player.arm()  # In message order: a "stop" from here on cancels this run, even before it starts
+            threading.Thread(target=run, args=message[1:], name="playback", daemon=True).start()
+        elif kind == "stop":
+            player.stop()
+        elif kind == "speed":
+            player.set_speed(message[1])
+        elif kind == "config":
+            config.update(message[1])
+        elif kind == "quit":
+            break
+    player.stop()
+
+class PlaybackWorker:
+    """Plays recordings in a separate, higher-priority process.
+
+    Same calls as Player for the app's purposes (play, stop, set_speed,
+    timing_stats, trace): plans compiled here are sent over, settings changes
+    on `config` are forwarded, and iteration stats stream back. The UI
+    process's GIL and render loop no longer share a scheduler with playback.
+    """
+
+    def __init__(self, config, command=None):
+        self.config = config
+        self.command = command or worker_command()
+        self.priority = None  # What the worker managed to set, once it is ready
+        self.timing_stats = {}
+        self.trace = None
+        self._process = None
+        self._channel = None
+        self._done = threading.Event()
+        self._done.set()
+        self._error = None
+        self._on_iteration = None
+        self._run_lock = threading.Lock()  # Keeps "play" and "stop" messages in call order
+        self._stopped = False  # stop() since the last arm()
+        self.config.subscribe(self._on_config_change)
+
+    def start(self):
+        """Launch the worker process (done automatically on first play)"""
+        if self._process and self._process.poll() is None:
+            return
+        flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         creationflags=flags)
+        self._channel = _Channel(self._process.stdout, self._process.stdin)
+        threading.Thread(target=self._read_loop, name="playback-worker-reader", daemon=True).start()
+        # Changes not yet written to config.json
+        self._send(("config", dict(self.config.settings)))
+
+    @property
+    def is_playing(self):
+        return not self._done.is_set()
+
+    def play(self, plan, loops=1, loop_start=None, loop_end=None, on_iteration=None, start_at=0.0):
+        """Play a compiled plan in the worker; blocks until it finishes like Player.play"""
+        if self.is_playing: return
+        self.start()
+        with self._run_lock:
+            if self._stopped:
+                return  # Stopped before the run got here
+            self._on_iteration = on_iteration
+            self._error = None
+            self._done.clear()
+            try:
+                self._channel.send(("play", plan, loops, loop_start, loop_end, start_at, self.trace is not None))
+            except OSError:
+                self._done.set()
+                raise RuntimeError("Playback worker is not running")
+        self._done.wait()
+        if self._error:
+            raise RuntimeError(self._error)
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Stop playback in the worker; returns True once it reported back"""
+        with self._run_lock:
+            self._stopped = True
+            if not self.is_playing:
+                return True
+            self._send(("stop",))
+        return self._done.wait(timeout * 2)
+
+    def arm(self):
+        """Clear an earlier stop() ahead of a new run, like Player.arm"""
+        with self._run_lock:
+            self._stopped = False
+
+    def set_speed(self, speed):
+        self._send(("speed", speed))
+
+    def close(self):
+        """Ask the worker to exit (it also exits when this process does)"""
+        if self._process and self._process.poll() is None:
+            self._send(("quit",))
+            try:
+                self._process.wait(1.0)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+
+    def _send(self, message):
+        if self._channel and self._process.poll() is None:
+            try:
+                self._channel.send(message)
+            except OSError:
+                pass
+
+    def _on_config_change(self, key, value):
+        # The worker's own player picks these up (including live speed changes)
+        self._send(("config", {key: value}))
+
+    def _read_loop(self):
+        channel = self._channel
+        while True:
+            try:
+                message = channel.recv()
+            except (EOFError, OSError, pickle.UnpicklingError):
+                break
+            kind = message[0]
+            if kind == "ready":
+                self.priority = message[1]
+            elif kind == "iteration":
+                if self._on_iteration:
+                    self._on_iteration(message[1])
+            elif kind == "finished":
+                self.timing_stats, trace, self._error = message[1], message[2], message[3]
+                if self.trace is not None:
+                    self.trace = trace
+                self._done.set()
+        # Worker gone: don't leave a play() call waiting forever
+        if not self._done.is_set():
+            self._error = "Playback worker exited"
+            self._done.set()
+
+if __name__ == "__main__":
+    serve()
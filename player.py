@@ -1,80 +1,182 @@
-import time
-import win32api
-import win32con
 import numpy as np
-from config import Config
-import ctypes
+from config import shared_config
+from input_backend import default_backend
+from input_batch import BatchingBackend, SendInputSink
 import math
+import heapq
+import itertools
+import threading
+from collections import deque
+from timing import PreciseTimer, DriftReport, PlaybackClock, CancelToken, PlaybackCancelled
+import mouse_path
+from idle_trim import compress_idle
+from playback_trace import TracingBackend
+from seek import seek_index
+from plan import PlanCache, PlaybackPlan, OP_MOVE, OP_MOUSE_DOWN, OP_MOUSE_UP, OP_SCROLL, OP_KEY_PRESS
 
-# High-precision sleep function (better than time.sleep)
-kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-kernel32.QueryPerformanceCounter.argtypes = [ctypes.POINTER(ctypes.c_int64)]
-kernel32.QueryPerformanceFrequency.argtypes = [ctypes.POINTER(ctypes.c_int64)]
+# Shared hybrid timer for module-level callers (blocks in the OS, spins only at the end)
+_default_timer = PreciseTimer()
 def precise_sleep(duration):
-    """Sleep with 0.001 second precision"""
-    if duration <= 0: return
-    start = ctypes.c_int64()
-    freq = ctypes.c_int64()
-    kernel32.QueryPerformanceCounter(ctypes.byref(start))
-    kernel32.QueryPerformanceFrequency(ctypes.byref(freq))
-    target = start.value + int(duration * freq.value)
-    while True:
-        now = ctypes.c_int64()
-        kernel32.QueryPerformanceCounter(ctypes.byref(now))
-        if now.value >= target:
-            break
+    """Sleep with sub-millisecond precision without pinning a core"""
+    return _default_timer.sleep(duration)
+
+# Settings the player reads from config, with fallbacks for keys config doesn't know
+PLAYER_DEFAULTS = {
+    "playback_speed": 1.0,
+    "jitter_amount": 0.5,  # Reduced from 2.0 for less wiggling
+    "hover_delay": 0.15,   # Reduced from 0.3 for more responsive clicks
+    "human_like_mouse": True,
+    "mouse_acceleration": 0.7,
+    "micro_jitter": 0.1,   # Reduced from 0.2 for less wiggling
+    "path_smoothing": 0.5,
+    "gaming_mode": False,
+    "spin_threshold": 0.0005,  # Busy-wait only for the last 0.5ms of a wait
+    "absolute_timing": True,   # Schedule events on the playback clock, not after the previous one
+    "catch_up_threshold": 0.05,  # Skip interpolation when this far behind
+    "random_seed": None,  # Fixed seed makes humanized paths reproducible
+    "batched_input": True,  # One SendInput call per scheduler tick on Windows
+    "plan_cache_mb": 256,  # Memory budget for compiled recordings kept warm
+    "trim_dead_time": False,  # Drop dead time before the first input and the record/stop hotkeys
+    "max_idle_gap": 0.0  # Clamp idle stretches (nothing held) to this many seconds, 0 = off
+}
+
+MIN_LOOP_PERIOD = 0.01  # Loops over a zero-length range still advance the clock
+ITERATION_HISTORY = 1000  # Per-iteration stats kept for long infinite loops
+STOP_TIMEOUT = 0.25  # How long stop() waits for the playing thread to wind down
 
 class Player:
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, timer=None, backend=None, config=None):
+        self.config = config or shared_config()
+        
+        # Load config values with error handling
+        self._load_config()
+        
+        self.backend = backend or self._default_backend()  # Where input is injected
         self.is_playing = False
-        self.active_keys = set()  # Track currently pressed keys for gaming
+        self.active_keys = set()  # Virtual key codes currently held down
+        self.active_buttons = {}  # Mouse buttons currently held down -> (x, y) pressed at
+        self.cancel = CancelToken()  # Wakes and aborts every playback wait on stop(); re-armed by arm()
+        self._finished = threading.Event()  # Clear while a play() call is running
+        self._finished.set()
+        self._play_thread = None
         
         # Get virtual screen dimensions for multi-monitor support
-        self.virtual_screen_width = win32api.GetSystemMetrics(78)  # SM_CXVIRTUALSCREEN
-        self.virtual_screen_height = win32api.GetSystemMetrics(79)  # SM_CYVIRTUALSCREEN
-        self.virtual_screen_left = win32api.GetSystemMetrics(76)  # SM_XVIRTUALSCREEN
-        self.virtual_screen_top = win32api.GetSystemMetrics(77)  # SM_YVIRTUALSCREEN
+        (self.virtual_screen_left, self.virtual_screen_top,
+         self.virtual_screen_width, self.virtual_screen_height) = self.backend.virtual_screen()
         
         # Track last valid position to prevent wild jumps
         self.last_valid_x = None
         self.last_valid_y = None
-        self.key_durations = {}  # Track expected key durations
+        # Compiled recordings, keyed by recording and geometry (LRU, bounded by size)
+        self.plans = PlanCache(max_bytes=int(self.plan_cache_mb * 1024 * 1024))
+        self.pending_actions = []  # Heap of (deadline, seq, action, args) still to fire
+        self._action_seq = itertools.count()  # Tie-breaker keeps same-deadline actions in order
         
-        # Load config values with error handling
-        self._load_config()
+        # Pluggable clock/sleeper used for every wait during playback
+        self.timer = timer or PreciseTimer(spin_threshold=self.spin_threshold)
+        # Recording time -> timer deadlines; every wait goes through it so speed can change live
+        self.clock = PlaybackClock(self.timer, self.playback_speed, self.cancel)
+        self.timing_stats = {}
+        self.rng = np.random.default_rng(self.random_seed)
+        self.drift = DriftReport()
+        self.iterations = deque(maxlen=ITERATION_HISTORY)  # Per-loop-iteration timing of the last run
+        self.trace = None  # Set a playback_trace.PlaybackTrace to record where playback time goes
+        self.config.subscribe(self._on_config_change)
     
     def _load_config(self):
         """Safely load config values with default fallbacks"""
-        config_defaults = {
-            "playback_speed": 1.0,
-            "jitter_amount": 0.5,  # Reduced from 2.0 for less wiggling
-            "hover_delay": 0.15,   # Reduced from 0.3 for more responsive clicks
-            "human_like_mouse": True,
-            "mouse_acceleration": 0.7,
-            "micro_jitter": 0.1,   # Reduced from 0.2 for less wiggling
-            "path_smoothing": 0.5,
-            "gaming_mode": False
-        }
-        
-        for key, default in config_defaults.items():
+        for key, default in PLAYER_DEFAULTS.items():
             try:
                 value = self.config.get(key)
                 setattr(self, key, value)
             except (KeyError, TypeError):
                 setattr(self, key, default)
+        self.jitter = self.jitter_amount
+    
+    def _on_config_change(self, key, value):
+        """Pick up settings changed anywhere in the app (e.g. the UI sliders)"""
+        if key == "playback_speed":
+            self.set_speed(value)
+        elif key in PLAYER_DEFAULTS:
+            setattr(self, key, value)
+            if key == "jitter_amount":
+                self.jitter = value
+    
+    def set_speed(self, speed):
+        """Change playback speed, also mid-run: the rest of the schedule
+        (events, queued key releases, path steps) is re-based from now on"""
+        self.playback_speed = speed
+        self.clock.set_speed(speed)
+    
+    def _default_backend(self):
+        backend = default_backend()
+        if self.batched_input and backend.name == "win32":
+            # Same-tick actions (path steps, press + release) go out in one OS call
+            backend = BatchingBackend(backend, SendInputSink(backend.virtual_screen()))
+        return backend
     
-    def play(self, recording_data):
+    def compile(self, recording_data, cache_key=None):
+        """Compile (or fetch the cached) playback plan for the current screen geometry"""
+        geometry = (self.virtual_screen_left, self.virtual_screen_top,
+                    self.virtual_screen_width, self.virtual_screen_height)
+        return self.plans.get(recording_data, geometry, self.backend.resolve_vk, key=cache_key)
+    
+    def compile_file(self, path):
+        """Load and compile a recording file, reusing the cached plan while the file is unchanged"""
+        geometry = (self.virtual_screen_left, self.virtual_screen_top,
+                    self.virtual_screen_width, self.virtual_screen_height)
+        return self.prepare(self.plans.get_file(path, geometry, self.backend.resolve_vk))
+    
+    def prepare(self, plan):
+        """Apply the dead-time settings to a compiled plan (the result is cached on the plan)"""
+        if plan.trim_report is not None or not (self.trim_dead_time or self.max_idle_gap):
+            return plan
+        drop_codes = ()
+        if self.trim_dead_time:
+            hotkeys = []
+            for key in ("start_key", "stop_key"):
+                try:
+                    hotkeys.append(self.config.get(key).strip('\'\"'))
+                except (KeyError, TypeError, AttributeError):
+                    pass
+            drop_codes = tuple(sorted({self.backend.resolve_vk(key) for key in hotkeys} - {0}))
+        key = ("idle", self.trim_dead_time, self.max_idle_gap or None, drop_codes)
+        trimmed = plan.derived.get(key)
+        if trimmed is None:
+            trimmed, _ = compress_idle(plan, max_gap=self.max_idle_gap or None,
+                                       trim_leading=self.trim_dead_time, drop_codes=drop_codes)
+            trimmed.rows()
+            plan.derived[key] = trimmed
+        return trimmed
+    
+    def play(self, recording_data, loops=1, loop_start=None, loop_end=None, on_iteration=None, start_at=0.0):
+        """Play a recording `loops` times (None = until stopped).
+
+        With loop points, events before loop_start play once, the range
+        [loop_start, loop_end) repeats and events after loop_end play once at
+        the end. Iterations are scheduled on one continuous clock, so there is
+        no gap or re-sync between them. on_iteration(stats) is called as each
+        iteration completes.
+
+        start_at (recording seconds, after idle trimming) starts the first
+        iteration partway through: keys and buttons held at that point are
+        pressed and the cursor placed before the first event plays.
+
+        A stop() since the last arm() cancels the run before it injects
+        anything, so call arm() where the run is requested, not here.
+        """
         if self.is_playing: return
-        self.is_playing = True
         
-        # Extract recording data
-        virtual_screen = recording_data.get("virtual_screen", {})
-        events = recording_data.get("events", [])
+        # Recordings are compiled once per geometry; a precompiled plan is used as-is.
+        # Done before claiming the player so a bad recording raises without leaving it "playing"
+        plan = recording_data if isinstance(recording_data, PlaybackPlan) else self.compile(recording_data)
+        plan = self.prepare(plan)
+        start_at = max(0.0, start_at or 0.0)
+        seek_state = seek_index(plan).state_at(start_at) if start_at else None
         
         # Handle gaming mode from recording data or config
-        if "gaming_mode" in recording_data:
-            self.gaming_mode = recording_data["gaming_mode"]
+        if plan.gaming_mode is not None:
+            self.gaming_mode = plan.gaming_mode
         else:
             try:
                 self.gaming_mode = self.config.get("gaming_mode")
@@ -89,54 +191,93 @@ class Player:
             self.micro_jitter = min(0.05, self.micro_jitter)  # Even less jitter for gaming
             self.hover_delay = min(0.05, self.hover_delay)
         
-        start_time = time.perf_counter()
-        last_timestamp = 0
+        # One generator per run drives all path, jitter and timing randomness
+        self.rng = np.random.default_rng(self.random_seed)
+        self.timer.reset_stats()
+        self.backend.reset_stats()
+        self.drift = DriftReport()
+        self.iterations.clear()
+        iteration_drift = DriftReport()
+        iteration = 1
+        self.clock.start(self.playback_speed, start_at)
+        iteration_started = self.timer.now()
+        last_timestamp = start_at
+        self.pending_actions = []
         
         # FIX: Don't set initial position from current cursor
         # Instead, wait for first move event
         self.last_valid_x = None
         self.last_valid_y = None
         
+        # Tracing wraps the backend for the run so every OS call gets a span
+        trace = self.trace
+        untraced_backend = self.backend
+        if trace:
+            self.backend = TracingBackend(self.backend, trace, self.timer.now)
+        
+        # Claimed only right before the try: its finally is what sets _finished
+        # again, so nothing that can raise may run in between
+        self.is_playing = True
+        self._finished.clear()
+        self._play_thread = threading.current_thread()
         try:
-            for i, event in enumerate(events):
+            self.cancel.check()  # Stopped while the run was being set up
+            if seek_state:
+                self._restore_state(seek_state)
+            first = seek_state.index if seek_state else 0
+            for row_iteration, shift, row in self._loop_rows(plan, loops, loop_start, loop_end, first):
                 if not self.is_playing: break
+                timestamp, op, rel_x, rel_y, x, y, code, value = row
+                if shift:
+                    # Later iterations run on the same clock, offset by whole loop periods
+                    timestamp += shift
+                    if op == OP_KEY_PRESS:
+                        value += shift
                 
-                # Calculate delay with microsecond precision
-                current_time = time.perf_counter() - start_time
-                event_time = event[-1] / self.playback_speed
-                delay = event_time - last_timestamp
-                
-                # Handle key durations separately
-                if event[0] == "key_duration":
-                    key = event[1].lower()
-                    self.key_durations[key] = event[2] / self.playback_speed
-                    continue
+                # Delays are in recording seconds; the clock turns them into
+                # deadlines at whatever the speed is when we get there
+                speed = self.clock.speed
+                delay = timestamp - last_timestamp
                 
                 # Add human-like variation (1-5ms) but less for gaming
                 variation = 0.002 if not self.gaming_mode else 0.001  # Reduced variation
-                if delay > 0.01:
-                    delay += np.random.uniform(-variation, variation)
-                    precise_sleep(max(0, delay))
-                last_timestamp = event_time
+                behind = False
+                if self.absolute_timing:
+                    # Wait for the absolute deadline so time spent in handlers never accumulates
+                    jitter = self.rng.uniform(-variation, variation) * speed if delay > 0.01 * speed else 0.0
+                    self._wait_until(timestamp + jitter)
+                    lag = self.timer.now() - self.clock.to_timer(timestamp)
+                    self.drift.record(lag)
+                    # Too far behind: go straight to the target instead of interpolating
+                    behind = lag > self.catch_up_threshold
+                elif delay > 0.01 * speed:
+                    delay += self.rng.uniform(-variation, variation) * speed
+                    self._wait_until(self.clock.media_now() + max(0, delay))
+                last_timestamp = timestamp
+                if trace:
+                    handler_start = self.timer.now()
+                if row_iteration != iteration:
+                    # Iterations are measured from first event to first event
+                    iteration_started = self._finish_iteration(iteration, iteration_started, iteration_drift, on_iteration)
+                    iteration, iteration_drift = row_iteration, DriftReport()
+                if self.absolute_timing:
+                    iteration_drift.record(lag)
                 
                 # Process event with precision timing
-                if event[0] == "move":
-                    rel_x, rel_y = event[1], event[2]
-                    # Validate relative coordinates
-                    rel_x = max(0.0, min(1.0, rel_x))
-                    rel_y = max(0.0, min(1.0, rel_y))
-                    
-                    # Convert to current screen coordinates
-                    x = int(self.virtual_screen_left + rel_x * self.virtual_screen_width)
-                    y = int(self.virtual_screen_top + rel_y * self.virtual_screen_height)
-                    
+                if op == OP_MOVE:
                     # CRITICAL FIX: Check for wild jumps and correct them
-                    if self.last_valid_x is not None and self.last_valid_y is not None:
+                    if behind:
+                        self._move_mouse(x, y)
+                    elif self.last_valid_x is not None and self.last_valid_y is not None:
                         distance = math.sqrt((rel_x - self.last_valid_x)**2 + (rel_y - self.last_valid_y)**2)
                         # If jump is more than 50% of screen (likely error)
                         if distance > 0.5:  
                             # Move in smaller steps toward target
+                            if trace:
+                                span_start = self.timer.now()
                             self._gradual_move(self.last_valid_x, self.last_valid_y, rel_x, rel_y)
+                            if trace:
+                                trace.span("gradual move", "path", span_start, self.timer.now())
                         else:
                             if self.human_like_mouse:
                                 # Human-like mouse movement with path smoothing
@@ -146,14 +287,14 @@ class Player:
                                 if self.jitter > 0:
                                     # Add small, natural jitter (less for gaming)
                                     jitter_amount = 0.002 if self.gaming_mode else 0.005
-                                    rel_x += np.random.uniform(-jitter_amount, jitter_amount)
-                                    rel_y += np.random.uniform(-jitter_amount, jitter_amount)
+                                    rel_x += self.rng.uniform(-jitter_amount, jitter_amount)
+                                    rel_y += self.rng.uniform(-jitter_amount, jitter_amount)
                                     rel_x = max(0.0, min(1.0, rel_x))
                                     rel_y = max(0.0, min(1.0, rel_y))
-                                
-                                # Convert to absolute coordinates for final move
-                                x = int(self.virtual_screen_left + rel_x * self.virtual_screen_width)
-                                y = int(self.virtual_screen_top + rel_y * self.virtual_screen_height)
+                                    
+                                    # Convert to absolute coordinates for final move
+                                    x = int(self.virtual_screen_left + rel_x * self.virtual_screen_width)
+                                    y = int(self.virtual_screen_top + rel_y * self.virtual_screen_height)
                                 self._move_mouse(x, y)
                     else:
                         # First move event - just go directly to position
@@ -162,83 +303,192 @@ class Player:
                     # Update last valid position
                     self.last_valid_x, self.last_valid_y = rel_x, rel_y
                 
-                elif event[0] == "click":
-                    rel_x, rel_y = event[1], event[2]
-                    button, pressed = event[3], event[4]
+                elif op == OP_MOUSE_DOWN:
+                    # Move to click position first (with validation)
+                    if self.last_valid_x is None or self.last_valid_y is None:
+                        self._move_mouse(x, y)
+                    elif self.human_like_mouse and not behind:
+                        self._human_like_move(self.last_valid_x, self.last_valid_y, rel_x, rel_y)
+                    else:
+                        self._move_mouse(x, y)
+                    
+                    # Update position after move
+                    self.last_valid_x, self.last_valid_y = rel_x, rel_y
                     
-                    # Validate relative coordinates
-                    rel_x = max(0.0, min(1.0, rel_x))
-                    rel_y = max(0.0, min(1.0, rel_y))
+                    # FIX: Add consistent delay after moving to ensure mouse is settled
+                    # (skipped while catching up, the cursor jumped straight there)
+                    if trace:
+                        span_start = self.timer.now()
+                    if not behind:
+                        self._wait(0.05)
                     
-                    # Convert to current screen coordinates
-                    x = int(self.virtual_screen_left + rel_x * self.virtual_screen_width)
-                    y = int(self.virtual_screen_top + rel_y * self.virtual_screen_height)
+                    # FIX: Reduce random variation in hover delay for consistency
+                    hover_delay = self.hover_delay * 0.9  # Using 90% consistently
+                    self._wait(hover_delay)
+                    if trace:
+                        trace.span("click settle", "settle", span_start, self.timer.now())
                     
+                    self._mouse_down(x, y, code)
+                
+                elif op == OP_MOUSE_UP:
                     # FIX: Ensure we're at the click position before clicking
                     if self.last_valid_x is None or self.last_valid_y is None:
                         self._move_mouse(x, y)
                         self.last_valid_x, self.last_valid_y = rel_x, rel_y
                     
-                    if pressed:
-                        # Move to click position first (with validation)
-                        if self.last_valid_x is None or self.last_valid_y is None:
-                            self._move_mouse(x, y)
-                            self.last_valid_x, self.last_valid_y = rel_x, rel_y
-                        elif self.human_like_mouse:
-                            self._human_like_move(self.last_valid_x, self.last_valid_y, rel_x, rel_y)
-                        else:
-                            self._move_mouse(x, y)
-                        
-                        # Update position after move
-                        self.last_valid_x, self.last_valid_y = rel_x, rel_y
-                        
-                        # FIX: Add consistent delay after moving to ensure mouse is settled
-                        precise_sleep(0.05)
-                        
-                        # FIX: Reduce random variation in hover delay for consistency
-                        hover_delay = self.hover_delay * 0.9  # Using 90% consistently
-                        precise_sleep(hover_delay)
-                        
-                        self._mouse_down(x, y, button)
-                    else:
-                        # FIX: Add small consistent delay before releasing
-                        precise_sleep(0.02)
-                        self._mouse_up(x, y, button)
+                    # FIX: Add small consistent delay before releasing
+                    if trace:
+                        span_start = self.timer.now()
+                    self._wait(0.02)
+                    if trace:
+                        trace.span("release settle", "settle", span_start, self.timer.now())
+                    self._mouse_up(x, y, code)
                 
-                elif event[0] == "scroll":
-                    rel_x, rel_y = event[1], event[2]
-                    dx, dy = event[3], event[4]
-                    
-                    # Validate relative coordinates
-                    rel_x = max(0.0, min(1.0, rel_x))
-                    rel_y = max(0.0, min(1.0, rel_y))
-                    
-                    # Convert to current screen coordinates
-                    x = int(self.virtual_screen_left + rel_x * self.virtual_screen_width)
-                    y = int(self.virtual_screen_top + rel_y * self.virtual_screen_height)
-                    
-                    self._scroll(x, y, dx, dy)
+                elif op == OP_SCROLL:
+                    self._scroll(x, y, 0, value)
                 
-                elif "key_press" in event[0]:
-                    key = event[1].lower()
-                    self._key_press(key)
-                    self.active_keys.add(key)
+                elif op == OP_KEY_PRESS:
+                    # Repeated presses while held are OS auto-repeat, the release is already queued
+                    held = code in self.active_keys
+                    if held and self.absolute_timing:
+                        # A hold ending as this one starts (e.g. the previous iteration's
+                        # last hold) is released first, so jitter cannot reorder the two
+                        self._wait_until(timestamp)
+                        held = code in self.active_keys
+                    self._key_press(code)
+                    self.active_keys.add(code)
                     
-                    # Hold key for exact duration if available
-                    if key in self.key_durations:
-                        precise_sleep(self.key_durations[key])
-                        if key in self.active_keys:
-                            self._key_release(key)
-                            self.active_keys.remove(key)
-                        del self.key_durations[key]
+                    # Queue the release instead of blocking, so later events keep their timing
+                    # (value is the recorded release time, NaN if the key was never released)
+                    if value == value and not held:
+                        if self.absolute_timing:
+                            release_at = value
+                        else:
+                            release_at = self.clock.media_now() + (value - timestamp)
+                        self._schedule(release_at, self._release_key, code)
                 
-                elif "key_release" in event[0] and event[1].lower() not in self.key_durations:
-                    key = event[1].lower()
-                    if key in self.active_keys:
-                        self._key_release(key)
-                        self.active_keys.remove(key)
+                if trace:
+                    trace.event(op, self.clock.to_timer(timestamp), handler_start, self.timer.now())
+            
+            # Let holds that outlast the last event finish on time
+            while self.pending_actions and self.is_playing:
+                self._wait_until(self.pending_actions[0][0])
+            if self.is_playing:
+                self._finish_iteration(iteration, iteration_started, iteration_drift, on_iteration)
+        except PlaybackCancelled:
+            pass  # stop() woke us mid-wait; nothing after the wait may be injected
         finally:
             self.is_playing = False
+            # Never leave keys or buttons held after playback ends
+            self._release_all()
+            self.backend = untraced_backend
+            # Keep the achieved wake-up accuracy and drift of this run for inspection
+            self.timing_stats = self.timer.stats()
+            self.timing_stats["drift"] = self.drift.as_dict()
+            self.timing_stats["injection"] = self.backend.stats()
+            self.timing_stats["iterations"] = list(self.iterations)
+            if plan.trim_report:
+                # Recording seconds removed, and what that saves per iteration at this speed
+                self.timing_stats["idle_trim"] = dict(plan.trim_report,
+                                                      wall_time_saved=plan.trim_report["time_saved"] / self.clock.speed)
+            self._finished.set()
+    
+    def _restore_state(self, state):
+        """Recreate the input held down at a seek point before playing on from it"""
+        if state.cursor:
+            x, y, self.last_valid_x, self.last_valid_y = state.cursor
+            self._move_mouse(x, y)
+        for button, (x, y) in state.held_buttons.items():
+            self._mouse_down(x, y, button)
+        for code, release_at in state.held_keys.items():
+            self._key_press(code)
+            self.active_keys.add(code)
+            if release_at != math.inf:
+                self._schedule(release_at, self._release_key, code)
+        self.backend.flush()
+    
+    def _loop_rows(self, plan, loops, loop_start, loop_end, first=0):
+        """(iteration, time shift, row) for every event of a looped run,
+        the first iteration starting at row `first`"""
+        rows = plan.rows()
+        start_index = int(np.searchsorted(plan.times, loop_start, "left")) if loop_start else 0
+        if loop_end is None:
+            # Holds still down after the last row belong to the iteration too
+            end_index, loop_end = len(rows), plan.end_time
+        else:
+            end_index = int(np.searchsorted(plan.times, loop_end, "left"))
+        if loops != 1 and start_index >= end_index:
+            raise ValueError("Loop range contains no events")
+        period = max(loop_end - (loop_start or 0.0), MIN_LOOP_PERIOD)
+        
+        if first >= end_index:
+            # Started in the outro: nothing left to loop
+            for row in rows[first:]:
+                yield 1, 0.0, row
+            return
+        # First iteration: intro plus the loop body
+        for row in rows[first:end_index]:
+            yield 1, 0.0, row
+        iteration = 1
+        while loops is None or iteration < loops:
+            shift = iteration * period
+            iteration += 1
+            for row in rows[start_index:end_index]:
+                yield iteration, shift, row
+        # Outro after the last iteration
+        for row in rows[end_index:]:
+            yield iteration, (iteration - 1) * period, row
+    
+    def _finish_iteration(self, iteration, started, drift, on_iteration):
+        """Record the timing of a completed iteration; returns when the next one starts"""
+        now = self.timer.now()
+        stats = {
+            "iteration": iteration,
+            "duration": now - started,
+            "drift": drift.as_dict()
+        }
+        self.iterations.append(stats)
+        if on_iteration:
+            on_iteration(stats)
+        return now
+    
+    def _schedule(self, deadline, action, *args):
+        """Queue an action to run once playback reaches deadline (recording seconds)"""
+        heapq.heappush(self.pending_actions, (deadline, next(self._action_seq), action, args))
+    
+    def _wait_until(self, deadline):
+        """Sleep until recording time deadline, firing any queued actions that fall due first"""
+        while self.pending_actions and self.pending_actions[0][0] <= deadline:
+            due, _, action, args = heapq.heappop(self.pending_actions)
+            self.backend.flush()
+            self._sleep(due)
+            action(*args)
+        # Everything issued up to now belongs to this tick
+        self.backend.flush()
+        self._sleep(deadline)
+    
+    def _sleep(self, deadline):
+        if self.trace:
+            start = self.timer.now()
+            self.clock.sleep_until(deadline)
+            self.trace.span("sleep", "wait", start, self.timer.now())
+        else:
+            self.clock.sleep_until(deadline)
+    
+    def _wait(self, duration):
+        """Wait `duration` real seconds (at the speed current when the wait starts)"""
+        if duration <= 0: return
+        self._wait_until(self.clock.media_now() + duration * self.clock.speed)
+    
+    def _wait_media(self, duration):
+        """Wait `duration` recording seconds, scaled by the live playback speed"""
+        if duration <= 0: return
+        self._wait_until(self.clock.media_now() + duration)
+    
+    def _release_key(self, vk):
+        if vk in self.active_keys:
+            self._key_release(vk)
+            self.active_keys.discard(vk)
     
     def _gradual_move(self, start_rel_x, start_rel_y, end_rel_x, end_rel_y):
         """Move mouse in smaller steps to prevent wild jumps"""
@@ -279,7 +529,7 @@ class Player:
             
             # Small delay between steps (faster for gaming)
             delay = 0.02 if self.gaming_mode else 0.03
-            precise_sleep(delay)
+            self._wait(delay)
         
         # Final adjustment to exact position
         if self.human_like_mouse:
@@ -308,6 +558,9 @@ class Player:
         # Determine number of intermediate points based on distance
         num_points = max(3, min(25, int(distance * 30)))
         
+        if self.trace:
+            span_start = self.timer.now()
+        
         # Generate a proper Bezier curve with natural variation
         points = self._generate_bezier_path(start_rel_x, start_rel_y, end_rel_x, end_rel_y, num_points)
         
@@ -316,276 +569,87 @@ class Player:
         
         # Calculate timing with acceleration/deceleration
         timings = self._calculate_human_timing(num_points, distance)
+        if self.trace:
+            self.trace.span("path generation", "path", span_start, self.timer.now())
         
-        # Move through each point with proper timing
-        for i, (rel_x, rel_y) in enumerate(points):
-            # Skip the first point (we're already there)
-            if i == 0:
-                continue
-            
-            # Convert to absolute coordinates
-            x = int(self.virtual_screen_left + rel_x * self.virtual_screen_width)
-            y = int(self.virtual_screen_top + rel_y * self.virtual_screen_height)
-            
-            self._move_mouse(x, y)
+        # Convert the whole path to absolute coordinates at once
+        xs = (self.virtual_screen_left + points[:, 0] * self.virtual_screen_width).astype(int).tolist()
+        ys = (self.virtual_screen_top + points[:, 1] * self.virtual_screen_height).astype(int).tolist()
+        sleeps = timings.tolist()  # Recording seconds, scaled by the live speed
+        
+        # Move through each point with proper timing (skip the first point, we're already there)
+        for i in range(1, len(xs)):
+            self._move_mouse(xs[i], ys[i])
             
             # Sleep according to timing profile
-            if i < len(timings):
-                precise_sleep(timings[i-1] * self.playback_speed)
+            if i < len(sleeps):
+                self._wait_media(sleeps[i-1])
     
     def _generate_bezier_path(self, x0, y0, x1, y1, num_points):
         """Generate a smooth Bezier curve path between two points"""
-        # Create a control point with slight deviation for more natural movement
-        mid_x = (x0 + x1) / 2
-        mid_y = (y0 + y1) / 2
-        
-        # Add controlled deviation based on distance for natural movement
-        distance = math.sqrt((x1 - x0)**2 + (y1 - y0)**2)
-        # Calculate max deviation (5-15% of distance, less for gaming)
-        max_deviation = distance * (0.05 if self.gaming_mode else 0.15)
-        max_deviation = min(max_deviation, 0.2)  # Cap at 20% of screen
-        
-        # Calculate perpendicular direction for deviation
-        angle = math.atan2(y1 - y0, x1 - x0) - math.pi/2
-        # Random deviation within limits
-        deviation = max_deviation * np.random.uniform(-1, 1)
-        
-        # Calculate control point with deviation
-        cx = mid_x + deviation * math.cos(angle)
-        cy = mid_y + deviation * math.sin(angle)
-        
-        # Ensure control point is within reasonable bounds
-        cx = max(0.0, min(1.0, cx))
-        cy = max(0.0, min(1.0, cy))
-        
-        points = []
-        for i in range(num_points + 1):
-            t = i / num_points
-            # Quadratic Bezier formula
-            x = (1-t)**2 * x0 + 2*(1-t)*t * cx + t**2 * x1
-            y = (1-t)**2 * y0 + 2*(1-t)*t * cy + t**2 * y1
-            points.append((x, y))
-        return points
+        return mouse_path.bezier_path(self.rng, x0, y0, x1, y1, num_points, self.gaming_mode)
     
     def _add_micro_jitter(self, points, distance):
         """Add subtle, natural variations to the path"""
-        if self.micro_jitter <= 0:
-            return points
-            
-        jittered_points = []
-        for i, (x, y) in enumerate(points):
-            # Micro jitter gets smaller toward the end
-            progress = i / len(points)
-            
-            # Scale jitter based on distance and gaming mode - REDUCED INTENSITY
-            base_intensity = self.micro_jitter * (0.05 if self.gaming_mode else 0.1)
-            intensity = base_intensity * (1 - progress * 0.7)
-            
-            # Only add jitter if it won't cause wild movement
-            if i > 0:
-                prev_x, prev_y = jittered_points[-1]
-                max_jitter = math.sqrt((x - prev_x)**2 + (y - prev_y)**2) * 0.3
-                intensity = min(intensity, max_jitter)
-            
-            # Add subtle variation
-            jitter_x = np.random.uniform(-intensity, intensity)
-            jitter_y = np.random.uniform(-intensity, intensity)
-            
-            # Validate coordinates
-            new_x = max(0.0, min(1.0, x + jitter_x))
-            new_y = max(0.0, min(1.0, y + jitter_y))
-            
-            jittered_points.append((new_x, new_y))
-        return jittered_points
+        return mouse_path.micro_jitter(self.rng, points, self.micro_jitter, self.gaming_mode)
     
     def _calculate_human_timing(self, num_points, distance):
         """Calculate timing profile that mimics human mouse movement"""
-        timings = []
-        # Base time per percentage of screen (in seconds)
-        time_per_percent = 0.08  # Time to move 1% of screen
-        
-        # Total time for the movement
-        total_time = max(0.03, distance * time_per_percent)
-        
-        # For gaming, movements are faster and more direct
-        if self.gaming_mode:
-            total_time *= 0.6  # 40% faster for gaming
-        
-        for i in range(num_points - 1):  # -1 because we skip first point
-            # Position along the path (0 to 1)
-            t = i / (num_points - 2)
-            
-            # Create acceleration/deceleration profile
-            # For gaming, use more linear profile; otherwise use ease-in-out
-            if self.gaming_mode:
-                # More linear for gaming (direct movements)
-                timing_factor = t
-            else:
-                # Ease-in-out for regular use
-                if t < 0.5:
-                    timing_factor = 4 * t * t * t  # Ease in
-                else:
-                    t_adj = t - 1
-                    timing_factor = 4 * t_adj * t_adj * t_adj + 1  # Ease out
-            
-            # Calculate time for this segment
-            if i == 0:
-                segment_time = total_time * timing_factor
-            else:
-                prev_t = (i-1) / (num_points - 2)
-                if self.gaming_mode:
-                    prev_timing = prev_t
-                else:
-                    if prev_t < 0.5:
-                        prev_timing = 4 * prev_t * prev_t * prev_t
-                    else:
-                        prev_t_adj = prev_t - 1
-                        prev_timing = 4 * prev_t_adj * prev_t_adj * prev_t_adj + 1
-                segment_time = total_time * (timing_factor - prev_timing)
-            
-            # Add natural variation (less for gaming)
-            variation = np.random.uniform(-0.02, 0.02) * (0.3 if self.gaming_mode else 1.0)
-            segment_time *= (1 + variation)
-            
-            # Minimum time per segment (faster for gaming)
-            min_time = 0.003 if self.gaming_mode else 0.005
-            timings.append(max(min_time, segment_time))
-        
-        return timings
+        return mouse_path.human_timing(self.rng, num_points, distance, self.gaming_mode)
+    
+    def arm(self):
+        """Clear an earlier stop() ahead of a new run. Call it in the order runs
+        are requested, so a stop() that arrives before play() gets going still
+        cancels that run."""
+        self.cancel.reset()
     
-    def stop(self):
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Stop playback from any thread.
+
+        Cancelling wakes the playing thread out of whatever it is waiting on
+        (idle gap, key hold, path step, settle delay); it injects nothing
+        more, releases held keys and buttons and returns. Returns True once
+        playback is quiet, False if the thread did not finish within
+        `timeout`. Only the playing thread touches the backend and held
+        state, so it still releases input when it does finish.
+        """
         self.is_playing = False
-        # Release any held keys
-        for key in list(self.active_keys):
-            self._key_release(key)
+        self.cancel.cancel()
+        if self._play_thread is threading.current_thread():
+            return True  # Called from a playback callback; the next wait unwinds
+        return self._finished.wait(timeout)
+    
+    def _release_all(self):
+        for vk in list(self.active_keys):
+            self._key_release(vk)
         self.active_keys.clear()
-        self.key_durations.clear()
+        for button, (x, y) in list(self.active_buttons.items()):
+            self._mouse_up(x, y, button)
+        self.active_buttons.clear()
+        self.pending_actions = []
+        self.backend.flush()
     
-    # Low-level Windows API calls (mimics real user input)
+    # Low-level input, sent through the backend (Win32 or simulated)
     def _move_mouse(self, x, y):
         """Move mouse with boundary checking"""
         # Ensure coordinates are within virtual screen bounds
         x = max(self.virtual_screen_left, min(self.virtual_screen_left + self.virtual_screen_width - 1, x))
         y = max(self.virtual_screen_top, min(self.virtual_screen_top + self.virtual_screen_height - 1, y))
-        win32api.SetCursorPos((int(x), int(y)))
+        self.backend.move(int(x), int(y))
     
     def _mouse_down(self, x, y, button):
-        if button == "left":
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, x, y, 0, 0)
-        elif button == "right":
-            win32api.mouse_event(win32con.MOUSEEVENTF_RIGHTDOWN, x, y, 0, 0)
-        elif button == "middle":
-            win32api.mouse_event(win32con.MOUSEEVENTF_MIDDLEDOWN, x, y, 0, 0)
+        self.backend.mouse_down(x, y, button)
+        self.active_buttons[button] = (x, y)
     
     def _mouse_up(self, x, y, button):
-        if button == "left":
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, x, y, 0, 0)
-        elif button == "right":
-            win32api.mouse_event(win32con.MOUSEEVENTF_RIGHTUP, x, y, 0, 0)
-        elif button == "middle":
-            win32api.mouse_event(win32con.MOUSEEVENTF_MIDDLEUP, x, y, 0, 0)
+        self.backend.mouse_up(x, y, button)
+        self.active_buttons.pop(button, None)
     
     def _scroll(self, x, y, dx, dy):
-        win32api.mouse_event(win32con.MOUSEEVENTF_WHEEL, x, y, int(dy * 120), 0)
-    
-    def _key_press(self, key):
-        # Normalize WASD keys for consistent handling
-        normalized_key = key.lower()
-        if normalized_key in ['w', 'a', 's', 'd']:
-            key = normalized_key
-            
-        if len(key) == 1:  # Character key
-            # FIX: Direct virtual key codes for WASD to ensure game compatibility
-            if key == 'w':
-                vk = 0x57  # Direct virtual key code for W
-            elif key == 'a':
-                vk = 0x41  # Direct virtual key code for A
-            elif key == 's':
-                vk = 0x53  # Direct virtual key code for S
-            elif key == 'd':
-                vk = 0x44  # Direct virtual key code for D
-            else:
-                vk = win32api.VkKeyScan(key)
-            win32api.keybd_event(vk, 0, 0, 0)
-        else:  # Special key
-            # Handle pynput key names
-            key_name = key.replace('Key.', '').replace("'", "").lower()
-            vk = self._get_virtual_key_code(key_name)
-            if vk:
-                win32api.keybd_event(vk, 0, 0, 0)
+        self.backend.scroll(x, y, dx, dy)
     
-    def _key_release(self, key):
-        # Normalize WASD keys for consistent handling
-        normalized_key = key.lower()
-        if normalized_key in ['w', 'a', 's', 'd']:
-            key = normalized_key
-            
-        if len(key) == 1:
-            # FIX: Direct virtual key codes for WASD to ensure game compatibility
-            if key == 'w':
-                vk = 0x57  # Direct virtual key code for W
-            elif key == 'a':
-                vk = 0x41  # Direct virtual key code for A
-            elif key == 's':
-                vk = 0x53  # Direct virtual key code for S
-            elif key == 'd':
-                vk = 0x44  # Direct virtual key code for D
-            else:
-                vk = win32api.VkKeyScan(key)
-            win32api.keybd_event(vk, 0, win32con.KEYEVENTF_KEYUP, 0)
-        else:
-            key_name = key.replace('Key.', '').replace("'", "").lower()
-            vk = self._get_virtual_key_code(key_name)
-            if vk:
-                win32api.keybd_event(vk, 0, win32con.KEYEVENTF_KEYUP, 0)
+    def _key_press(self, vk):
+        self.backend.key_down(vk)
     
-    def _get_virtual_key_code(self, key_name):
-        """Map key names to Windows virtual key codes"""
-        key_map = {
-            'enter': win32con.VK_RETURN,
-            'esc': win32con.VK_ESCAPE,
-            'escape': win32con.VK_ESCAPE,
-            'space': win32con.VK_SPACE,
-            'tab': win32con.VK_TAB,
-            'backspace': win32con.VK_BACK,
-            'delete': win32con.VK_DELETE,
-            'del': win32con.VK_DELETE,
-            'insert': win32con.VK_INSERT,
-            'home': win32con.VK_HOME,
-            'end': win32con.VK_END,
-            'pageup': win32con.VK_PRIOR,
-            'pagedown': win32con.VK_NEXT,
-            'up': win32con.VK_UP,
-            'down': win32con.VK_DOWN,
-            'left': win32con.VK_LEFT,
-            'right': win32con.VK_RIGHT,
-            'f1': win32con.VK_F1,
-            'f2': win32con.VK_F2,
-            'f3': win32con.VK_F3,
-            'f4': win32con.VK_F4,
-            'f5': win32con.VK_F5,
-            'f6': win32con.VK_F6,
-            'f7': win32con.VK_F7,
-            'f8': win32con.VK_F8,
-            'f9': win32con.VK_F9,
-            'f10': win32con.VK_F10,
-            'f11': win32con.VK_F11,
-            'f12': win32con.VK_F12,
-            'shift': win32con.VK_SHIFT,
-            'ctrl': win32con.VK_CONTROL,
-            'control': win32con.VK_CONTROL,
-            'alt': win32con.VK_MENU,
-            'capslock': win32con.VK_CAPITAL,
-            'numlock': win32con.VK_NUMLOCK,
-            'scrolllock': win32con.VK_SCROLL,
-            'pause': win32con.VK_PAUSE,
-            'print_screen': win32con.VK_SNAPSHOT,
-            'win': win32con.VK_LWIN,
-            'command': win32con.VK_LWIN,
-            'cmd': win32con.VK_LWIN,
-            'w': 0x57,  # 'W' key
-            'a': 0x41,  # 'A' key
-            's': 0x53,  # 'S' key
-            'd': 0x44,  # 'D' key
-        }
-        return key_map.get(key_name, 0)
\ No newline at end of file
+    def _key_release(self, vk):
+        self.backend.key_up(vk)
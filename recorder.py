@@ -1,47 +1,101 @@
-import math
 import time
+import itertools
+import threading
+import queue
 import numpy as np
 from pynput import mouse, keyboard
-from config import Config
-import win32api
-import win32con
+from config import shared_config
+import recording_format
+import capture_log
+from path_simplify import StreamingSimplifier
+from input_backend import default_backend
+
+LATENCY_SAMPLES = 4096  # Most recent hook callback timings kept for percentiles
 
 class Recorder:
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, backend=None, config=None):
+        self.config = config or shared_config()
+        self.backend = backend or default_backend()  # Only used for screen geometry
         self.events = []
         self.is_recording = False
         self.start_time = 0
         self.mouse_listener = None
         self.keyboard_listener = None
-        self.key_press_times = {}  # Track exact press times
         self.active_keys = set()  # Track currently pressed keys
+        self.capture = None  # Streaming segment writer while capturing
+        self._inbox = queue.SimpleQueue()  # Raw hook data, put by listener threads
+        self._worker = None
+        self._latency = [0] * LATENCY_SAMPLES  # Callback durations in ns (ring)
+        self._latency_seq = itertools.count()
+        self.event_count = 0
         
         # Get virtual screen dimensions for multi-monitor support
-        self.virtual_screen_width = win32api.GetSystemMetrics(78)  # SM_CXVIRTUALSCREEN
-        self.virtual_screen_height = win32api.GetSystemMetrics(79)  # SM_CYVIRTUALSCREEN
-        self.virtual_screen_left = win32api.GetSystemMetrics(76)  # SM_XVIRTUALSCREEN
-        self.virtual_screen_top = win32api.GetSystemMetrics(77)  # SM_YVIRTUALSCREEN
+        (self.virtual_screen_left, self.virtual_screen_top,
+         self.virtual_screen_width, self.virtual_screen_height) = self.backend.virtual_screen()
         
         # FIX: Handle default values properly for Config.get()
         try:
             self.gaming_mode = self.config.get("gaming_mode")
         except (KeyError, TypeError):
             self.gaming_mode = False
+        
+        # Mouse path simplification bounds (pixels / seconds)
+        try:
+            self.move_tolerance = self.config.get("move_tolerance")
+            self.move_max_interval = self.config.get("move_max_interval")
+        except (KeyError, TypeError):
+            self.move_tolerance = 3.0
+            self.move_max_interval = 0.25
+        self.simplifier = StreamingSimplifier(self.move_tolerance, self.move_max_interval)
+        self.last_save_stats = {}
+        
+        # Stream events to disk while capturing instead of holding them all in memory
+        try:
+            self.streaming = self.config.get("streaming_capture")
+        except (KeyError, TypeError):
+            self.streaming = True
+        self.config.subscribe(self._on_config_change)
+    
+    def _on_config_change(self, key, value):
+        """Settings changed elsewhere apply from the next capture on"""
+        if key == "gaming_mode":
+            self.gaming_mode = value
+        elif key == "move_tolerance":
+            self.move_tolerance = value
+        elif key == "move_max_interval":
+            self.move_max_interval = value
+        elif key == "streaming_capture":
+            self.streaming = value
     
     def start(self):
         if self.is_recording: return
         self.is_recording = True
         self.events = []
-        self.key_press_times = {}
         self.active_keys = set()
-        self.start_time = time.perf_counter()  # MICROSECOND PRECISION
+        self.event_count = 0
+        self.start_ns = time.perf_counter_ns()
+        self.start_time = self.start_ns / 1e9  # MICROSECOND PRECISION
+        self._inbox = queue.SimpleQueue()  # Fresh, so late callbacks of the last session can't leak in
+        self.simplifier = StreamingSimplifier(self.move_tolerance, self.move_max_interval)
+        self._latency = [0] * LATENCY_SAMPLES
+        self._latency_seq = itertools.count()
         
         # Capture virtual screen dimensions for multi-monitor support
-        self.virtual_screen_width = win32api.GetSystemMetrics(78)
-        self.virtual_screen_height = win32api.GetSystemMetrics(79)
-        self.virtual_screen_left = win32api.GetSystemMetrics(76)
-        self.virtual_screen_top = win32api.GetSystemMetrics(77)
+        (self.virtual_screen_left, self.virtual_screen_top,
+         self.virtual_screen_width, self.virtual_screen_height) = self.backend.virtual_screen()
+        
+        # Drop any unsaved capture from a previous session and open a new segment
+        self.discard_capture()
+        if self.streaming:
+            self.capture = capture_log.CaptureLog(capture_log.new_segment_path(), {
+                "virtual_screen": self._virtual_screen(),
+                "gaming_mode": self.gaming_mode
+            })
+            self.capture.start()
+        
+        # The worker must be running before the hooks start feeding it
+        self._worker = threading.Thread(target=self._capture_loop, name="capture-worker", daemon=True)
+        self._worker.start()
         
         self.mouse_listener = mouse.Listener(
             on_move=self.on_move,
@@ -63,126 +117,173 @@ class Recorder:
         if self.keyboard_listener:
             self.keyboard_listener.stop()
         
+        # Let the worker drain everything the hooks pushed before they stopped
+        self._inbox.put(None)
+        if self._worker:
+            self._worker.join()
+        self._flush_moves()
+        
         # Release any keys still pressed
         for key in list(self.active_keys):
-            timestamp = time.perf_counter() - self.start_time
-            # Calculate exact press duration
-            if key in self.key_press_times:
-                duration = timestamp - self.key_press_times[key]
-                self.events.append(("key_duration", str(key), duration))
-                del self.key_press_times[key]
-            
-            try:
-                self.events.append(("key_release", key.char, timestamp))
-            except AttributeError:
-                self.events.append(("key_release", str(key), timestamp))
+            timestamp = (time.perf_counter_ns() - self.start_ns) / 1e9
+            self._emit(("key_release", self._key_name(key), timestamp))
             self.active_keys.discard(key)
+        
+        # Persist whatever is still buffered
+        if self.capture:
+            self.capture.close()
+    
+    def _emit(self, event):
+        """Record an event, streaming it to the segment file when capturing to disk"""
+        self.event_count += 1
+        if self.capture:
+            self.capture.append(event)
+        else:
+            self.events.append(event)
     
+    def _virtual_screen(self):
+        return {
+            "width": self.virtual_screen_width,
+            "height": self.virtual_screen_height,
+            "left": self.virtual_screen_left,
+            "top": self.virtual_screen_top
+        }
+    
+    def discard_capture(self):
+        """Throw away the streamed segment of an unsaved capture"""
+        if self.capture:
+            self.capture.discard()
+            self.capture = None
+    
+    # pynput hook callbacks: each one is a single timestamped push onto the
+    # inbox so the OS low-level hooks are never held up. Everything else
+    # happens on the capture worker.
     def on_move(self, x, y):
+        t = time.perf_counter_ns()
         if not self.is_recording: return
-    
-        # Convert to relative coordinates (0-1 range) within virtual screen
-        rel_x = (x - self.virtual_screen_left) / self.virtual_screen_width
-        rel_y = (y - self.virtual_screen_top) / self.virtual_screen_height
-        
-        # Validate coordinates are within virtual screen bounds
-        rel_x = max(0.0, min(1.0, rel_x))
-        rel_y = max(0.0, min(1.0, rel_y))
-        
-        # Skip if this is too close to the last position (reduces noise)
-        if self.events and self.events[-1][0] == "move":
-            last_rel_x, last_rel_y = self.events[-1][1], self.events[-1][2]
-            distance = math.sqrt((rel_x - last_rel_x)**2 + (rel_y - last_rel_y)**2)
-            # Only record if moved at least 1% of screen distance
-            if distance < 0.01:  
-                return
-            
-        timestamp = time.perf_counter() - self.start_time
-        self.events.append(("move", rel_x, rel_y, timestamp))
+        self._inbox.put((self._handle_move, t, x, y))
+        self._latency[next(self._latency_seq) % LATENCY_SAMPLES] = time.perf_counter_ns() - t
     
     def on_click(self, x, y, button, pressed):
+        t = time.perf_counter_ns()
         if not self.is_recording: return
-        
-        # Convert to relative coordinates
-        rel_x = (x - self.virtual_screen_left) / self.virtual_screen_width
-        rel_y = (y - self.virtual_screen_top) / self.virtual_screen_height
-        
-        # Validate coordinates
-        rel_x = max(0.0, min(1.0, rel_x))
-        rel_y = max(0.0, min(1.0, rel_y))
-        
-        timestamp = time.perf_counter() - self.start_time
-        self.events.append(("click", rel_x, rel_y, button.name, pressed, timestamp))
+        self._inbox.put((self._handle_click, t, x, y, button, pressed))
+        self._latency[next(self._latency_seq) % LATENCY_SAMPLES] = time.perf_counter_ns() - t
     
     def on_scroll(self, x, y, dx, dy):
+        t = time.perf_counter_ns()
         if not self.is_recording: return
-        
-        # Convert to relative coordinates
-        rel_x = (x - self.virtual_screen_left) / self.virtual_screen_width
-        rel_y = (y - self.virtual_screen_top) / self.virtual_screen_height
-        
-        # Validate coordinates
-        rel_x = max(0.0, min(1.0, rel_x))
-        rel_y = max(0.0, min(1.0, rel_y))
-        
-        timestamp = time.perf_counter() - self.start_time
-        self.events.append(("scroll", rel_x, rel_y, dx, dy, timestamp))
+        self._inbox.put((self._handle_scroll, t, x, y, dx, dy))
+        self._latency[next(self._latency_seq) % LATENCY_SAMPLES] = time.perf_counter_ns() - t
     
     def on_press(self, key):
+        t = time.perf_counter_ns()
         if not self.is_recording: return
-        
-        # Track active keys for gaming
-        self.active_keys.add(key)
-        
-        timestamp = time.perf_counter() - self.start_time
-        self.key_press_times[key] = timestamp  # Track exact press time
-        
-        # Normalize WASD keys for consistent handling
-        key_str = str(key).lower()
-        if key_str in ["'w'", "'a'", "'s'", "'d'"]:
-            key_str = key_str[1]  # Extract the actual letter
-            
-        try:
-            self.events.append(("key_press", key.char.lower(), timestamp))
-        except AttributeError:
-            self.events.append(("key_press", key_str, timestamp))
+        self._inbox.put((self._handle_press, t, key))
+        self._latency[next(self._latency_seq) % LATENCY_SAMPLES] = time.perf_counter_ns() - t
     
     def on_release(self, key):
+        t = time.perf_counter_ns()
         if not self.is_recording: return
+        self._inbox.put((self._handle_release, t, key))
+        self._latency[next(self._latency_seq) % LATENCY_SAMPLES] = time.perf_counter_ns() - t
+    
+    def _capture_loop(self):
+        """Capture worker: drain the inbox and turn raw hook data into events"""
+        inbox = self._inbox
+        while True:
+            item = inbox.get()  # Blocks until a hook pushes something, no polling
+            if item is None:
+                break  # Pushed by stop() once the hooks are stopped
+            handler, t, *args = item
+            handler((t - self.start_ns) / 1e9, *args)
+    
+    def callback_latency_percentiles(self):
+        """Time spent inside the hook callbacks, in microseconds"""
+        # Unused slots are still zero
+        samples = np.array([v for v in self._latency if v], dtype=np.float64) / 1000.0
+        if not len(samples):
+            return {}
+        return {
+            "samples": len(samples),
+            "p50": float(np.percentile(samples, 50)),
+            "p90": float(np.percentile(samples, 90)),
+            "p99": float(np.percentile(samples, 99)),
+            "max": float(samples.max())
+        }
+    
+    def _relative(self, x, y):
+        # Convert to relative coordinates (0-1 range) within virtual screen
+        rel_x = (x - self.virtual_screen_left) / self.virtual_screen_width
+        rel_y = (y - self.virtual_screen_top) / self.virtual_screen_height
         
-        timestamp = time.perf_counter() - self.start_time
-        # Calculate exact press duration
-        if key in self.key_press_times:
-            duration = timestamp - self.key_press_times[key]
-            key_str = str(key).lower()
-            if key_str in ["'w'", "'a'", "'s'", "'d'"]:
-                key_str = key_str[1]
-            self.events.append(("key_duration", key_str, duration))
-            del self.key_press_times[key]
-        
-        self.active_keys.discard(key)
-        
+        # Validate coordinates are within virtual screen bounds
+        return max(0.0, min(1.0, rel_x)), max(0.0, min(1.0, rel_y))
+    
+    def _handle_move(self, timestamp, x, y):
+        # Only keep the samples needed to replay the path within tolerance
+        for px, py, pt in self.simplifier.add(x, y, timestamp):
+            rel_x, rel_y = self._relative(px, py)
+            self._emit(("move", rel_x, rel_y, pt))
+    
+    def _flush_moves(self):
+        """Emit the pending end of the current mouse path so it precedes the next event"""
+        for px, py, pt in self.simplifier.flush():
+            rel_x, rel_y = self._relative(px, py)
+            self._emit(("move", rel_x, rel_y, pt))
+    
+    def _handle_click(self, timestamp, x, y, button, pressed):
+        self._flush_moves()
+        rel_x, rel_y = self._relative(x, y)
+        self._emit(("click", rel_x, rel_y, button.name, pressed, timestamp))
+    
+    def _handle_scroll(self, timestamp, x, y, dx, dy):
+        self._flush_moves()
+        rel_x, rel_y = self._relative(x, y)
+        self._emit(("scroll", rel_x, rel_y, dx, dy, timestamp))
+    
+    def _key_name(self, key):
+        """Recorded name of a pynput key (lowercase char or "key.xxx")"""
         try:
-            self.events.append(("key_release", key.char.lower(), timestamp))
+            return key.char.lower()
         except AttributeError:
+            # Normalize WASD keys for consistent handling
             key_str = str(key).lower()
             if key_str in ["'w'", "'a'", "'s'", "'d'"]:
-                key_str = key_str[1]
-            self.events.append(("key_release", key_str, timestamp))
+                key_str = key_str[1]  # Extract the actual letter
+            return key_str
+    
+    def _handle_press(self, timestamp, key):
+        self._flush_moves()
+        # Track active keys for gaming
+        self.active_keys.add(key)
+        # Presses and releases are logged as they happen; saving folds each
+        # pair into one key_hold (recording_format.normalize_holds)
+        self._emit(("key_press", self._key_name(key), timestamp))
+    
+    def _handle_release(self, timestamp, key):
+        self._flush_moves()
+        self.active_keys.discard(key)
+        self._emit(("key_release", self._key_name(key), timestamp))
     
     def save_recording(self, filename):
-        """Save the recorded events to a file with virtual screen info"""
-        import json
-        recording_data = {
-            "virtual_screen": {
-                "width": self.virtual_screen_width,
-                "height": self.virtual_screen_height,
-                "left": self.virtual_screen_left,
-                "top": self.virtual_screen_top
-            },
-            "events": self.events,
-            "gaming_mode": self.gaming_mode
-        }
-        with open(filename, 'w') as f:
-            json.dump(recording_data, f)
-        return len(self.events)
\ No newline at end of file
+        """Save the recorded events to a file with virtual screen info
+        (binary format for .rmb files, JSON otherwise)"""
+        if self.capture:
+            # The segment already holds everything; read it back instead of keeping it in memory
+            recording_data = self.capture.read()
+        else:
+            recording_data = {
+                "virtual_screen": self._virtual_screen(),
+                "events": self.events,
+                "gaming_mode": self.gaming_mode
+            }
+        if filename.endswith(recording_format.BINARY_EXTENSION):
+            count = recording_format.save_binary(filename, recording_data)
+        else:
+            count = recording_format.save_json(filename, recording_data)
+        self.discard_capture()
+        
+        # How much the path simplification saved, and what it cost in accuracy
+        self.last_save_stats = self.simplifier.stats()
+        return count
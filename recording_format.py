@@ -0,0 +1,331 @@
+import os
+import sys
+import json
+import glob
+import argparse
+
+import numpy as np
+
+# Binary recording layout (all little-endian):
+#   8 bytes   magic b"RMACREC\0"
+#   uint32    format version
+#   uint32    header length in bytes
+#   header    UTF-8 JSON: virtual_screen, gaming_mode, names, count, columns
+#   padding   up to an 8-byte boundary
+#   columns   one contiguous fixed-width block per column, each 8-byte aligned
+MAGIC = b"RMACREC\0"
+VERSION = 2  # 2: key holds as single rows; version 1 files are converted on load
+BINARY_EXTENSION = ".rmb"
+JSON_EXTENSION = ".json"
+RECORDING_EXTENSIONS = (BINARY_EXTENSION, JSON_EXTENSION)
+
+# Event kinds stored in the "op" column
+EV_MOVE = 0
+EV_CLICK = 1
+EV_SCROLL = 2
+EV_KEY_PRESS = 3     # Legacy press/release/duration triplets, only seen
+EV_KEY_RELEASE = 4   # while converting old recordings (and in capture
+EV_KEY_DURATION = 5  # segments, which log presses and releases as they happen)
+EV_KEY_HOLD = 6
+
+EVENT_KINDS = {
+    "move": EV_MOVE,
+    "click": EV_CLICK,
+    "scroll": EV_SCROLL,
+    "key_press": EV_KEY_PRESS,
+    "key_release": EV_KEY_RELEASE,
+    "key_duration": EV_KEY_DURATION,
+    "key_hold": EV_KEY_HOLD
+}
+EVENT_NAMES = {v: k for k, v in EVENT_KINDS.items()}
+LEGACY_KEY_KINDS = ("key_press", "key_release", "key_duration")
+
+# Column name -> dtype. "code" is an index into the names table for clicks
+# (button) and keys, or the horizontal wheel delta for scrolls. "extra" is the
+# pressed flag for clicks, the vertical wheel delta for scrolls and the hold
+# duration for key_hold rows (NaN if the key was never released).
+COLUMNS = (
+    ("time", "<f8"),
+    ("op", "u1"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("code", "<i4"),
+    ("extra", "<f8")
+)
+
+class ColumnarRecording:
+    """A recording held as parallel column arrays plus its metadata.
+
+    Columns loaded from a binary file are read-only views into a memory map.
+    """
+
+    def __init__(self, columns, names, virtual_screen=None, gaming_mode=None):
+        self.columns = columns
+        self.names = names
+        self.virtual_screen = virtual_screen or {}
+        self.gaming_mode = gaming_mode
+
+    def __len__(self):
+        return len(self.columns["time"])
+
+    def get(self, key, default=None):
+        """Dict-style access to the metadata, like the JSON form"""
+        if key == "events":
+            return self.to_events()
+        if key == "virtual_screen":
+            return self.virtual_screen
+        if key == "gaming_mode":
+            return self.gaming_mode if self.gaming_mode is not None else default
+        return default
+
+    def __contains__(self, key):
+        return key in ("events", "virtual_screen") or (key == "gaming_mode" and self.gaming_mode is not None)
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return self.get(key)
+
+    @property
+    def duration(self):
+        return float(self.columns["time"][-1]) if len(self) else 0.0
+
+    def to_events(self):
+        """Expand back into the JSON event tuples written by Recorder"""
+        cols = self.columns
+        events = []
+        rows = zip(cols["time"].tolist(), cols["op"].tolist(), cols["x"].tolist(),
+                   cols["y"].tolist(), cols["code"].tolist(), cols["extra"].tolist())
+        for t, op, x, y, code, extra in rows:
+            if op == EV_MOVE:
+                events.append(("move", x, y, t))
+            elif op == EV_CLICK:
+                events.append(("click", x, y, self.names[code], bool(extra), t))
+            elif op == EV_SCROLL:
+                events.append(("scroll", x, y, code, int(extra), t))
+            elif op == EV_KEY_HOLD:
+                events.append(("key_hold", self.names[code], None if extra != extra else extra, t))
+            elif op == EV_KEY_DURATION:
+                events.append(("key_duration", self.names[code], extra))
+            else:
+                events.append((EVENT_NAMES[op], self.names[code], t))
+        return events
+
+    def to_json_dict(self):
+        return {
+            "virtual_screen": self.virtual_screen,
+            "events": self.to_events(),
+            "gaming_mode": bool(self.gaming_mode)
+        }
+
+def normalize_holds(events):
+    """Events with every key press/release (and key_duration) folded into
+    one ("key_hold", key, duration, start) event at the press position.
+
+    A press while the key is already held is OS auto-repeat and is dropped,
+    as are releases without a press; duration is None for keys never
+    released. Events that already use key_hold are returned unchanged.
+    """
+    if not any(event[0] in LEGACY_KEY_KINDS for event in events):
+        return events
+    normalized = []
+    open_holds = {}  # Key name -> index of its key_hold in normalized
+    for event in events:
+        kind = event[0]
+        if kind == "key_press":
+            key = event[1].lower()
+            if key not in open_holds:
+                open_holds[key] = len(normalized)
+                normalized.append(["key_hold", key, None, event[-1]])
+        elif kind == "key_release":
+            index = open_holds.pop(event[1].lower(), None)
+            if index is not None:
+                hold = normalized[index]
+                hold[2] = event[-1] - hold[3]
+        elif kind != "key_duration":  # Redundant with the release time
+            normalized.append(event)
+    return [tuple(event) for event in normalized]
+
+def _normalize_columns(columns, names):
+    """normalize_holds for the columns of a version 1 binary recording"""
+    kinds = np.asarray(columns["op"])
+    times = np.asarray(columns["time"])
+    codes = np.asarray(columns["code"])
+    op = kinds.copy()
+    extra = np.array(columns["extra"], dtype=np.float64)
+    keep = (kinds != EV_KEY_RELEASE) & (kinds != EV_KEY_DURATION)
+    open_holds = {}
+    for i in np.flatnonzero((kinds == EV_KEY_PRESS) | (kinds == EV_KEY_RELEASE)).tolist():
+        key = names[codes[i]].lower()
+        if kinds[i] == EV_KEY_PRESS:
+            if key in open_holds:
+                keep[i] = False  # Auto-repeat
+            else:
+                open_holds[key] = i
+                op[i] = EV_KEY_HOLD
+                extra[i] = np.nan
+        elif key in open_holds:
+            start = open_holds.pop(key)
+            extra[start] = times[i] - times[start]
+    normalized = {name: np.asarray(column)[keep] for name, column in columns.items()}
+    normalized["op"] = op[keep]
+    normalized["extra"] = extra[keep]
+    return normalized
+
+def from_json_dict(recording_data):
+    """Build a ColumnarRecording from the JSON form (old key triplets are converted)"""
+    events = normalize_holds(recording_data.get("events", []))
+    count = len(events)
+    columns = {name: np.zeros(count, dtype=dtype) for name, dtype in COLUMNS}
+    names = []
+    name_ids = {}
+
+    def name_id(name):
+        if name not in name_ids:
+            name_ids[name] = len(names)
+            names.append(name)
+        return name_ids[name]
+
+    for i, event in enumerate(events):
+        op = EVENT_KINDS[event[0]]
+        columns["op"][i] = op
+        columns["time"][i] = event[-1]
+        if op == EV_MOVE:
+            columns["x"][i], columns["y"][i] = event[1], event[2]
+        elif op == EV_CLICK:
+            columns["x"][i], columns["y"][i] = event[1], event[2]
+            columns["code"][i] = name_id(event[3])
+            columns["extra"][i] = 1.0 if event[4] else 0.0
+        elif op == EV_SCROLL:
+            columns["x"][i], columns["y"][i] = event[1], event[2]
+            columns["code"][i] = event[3]
+            columns["extra"][i] = event[4]
+        elif op == EV_KEY_HOLD:
+            columns["code"][i] = name_id(event[1])
+            columns["extra"][i] = np.nan if event[2] is None else event[2]
+
+    gaming_mode = recording_data["gaming_mode"] if "gaming_mode" in recording_data else None
+    return ColumnarRecording(columns, names, recording_data.get("virtual_screen", {}), gaming_mode)
+
+def save_binary(filename, recording):
+    """Write a recording (JSON dict or ColumnarRecording) in the binary format"""
+    if not isinstance(recording, ColumnarRecording):
+        recording = from_json_dict(recording)
+    count = len(recording)
+
+    # Lay the columns out after the header, each on an 8-byte boundary
+    layout = []
+    offset = 0
+    for name, dtype in COLUMNS:
+        layout.append({"name": name, "dtype": dtype, "offset": offset})
+        offset += _align(count * np.dtype(dtype).itemsize)
+
+    header = json.dumps({
+        "virtual_screen": recording.virtual_screen,
+        "gaming_mode": recording.gaming_mode,
+        "names": recording.names,
+        "count": count,
+        "columns": layout
+    }).encode("utf-8")
+    prefix_len = len(MAGIC) + 8 + len(header)
+    data_start = _align(prefix_len)
+
+    # Write to a temp file and rename so a crash never leaves a torn recording
+    temp_name = filename + ".tmp"
+    with open(temp_name, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([VERSION, len(header)], dtype="<u4").tobytes())
+        f.write(header)
+        f.write(b"\0" * (data_start - prefix_len))
+        for column in layout:
+            data = np.ascontiguousarray(recording.columns[column["name"]], dtype=column["dtype"])
+            f.write(data.tobytes())
+            f.write(b"\0" * (_align(data.nbytes) - data.nbytes))
+    os.replace(temp_name, filename)
+    return count
+
+def load_binary(filename):
+    """Memory-map a binary recording; columns are zero-copy read-only views"""
+    with open(filename, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a binary recording")
+        version, header_len = np.frombuffer(f.read(8), dtype="<u4")
+        if version > VERSION:
+            raise ValueError(f"{filename} uses format version {version}, newer than supported {VERSION}")
+        header = json.loads(f.read(int(header_len)).decode("utf-8"))
+
+    data_start = _align(len(MAGIC) + 8 + int(header_len))
+    count = header["count"]
+    columns = {}
+    if count:
+        mapped = np.memmap(filename, dtype=np.uint8, mode="r")
+        for column in header["columns"]:
+            columns[column["name"]] = np.frombuffer(
+                mapped, dtype=column["dtype"], count=count,
+                offset=data_start + column["offset"])
+    else:
+        columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS}
+    if version < 2:
+        # Key triplets become holds; the converted columns live in memory
+        columns = _normalize_columns(columns, header["names"])
+    return ColumnarRecording(columns, header["names"], header.get("virtual_screen"), header.get("gaming_mode"))
+
+def load_recording(filename):
+    """Load a recording in either format (binary is memory-mapped, JSON is parsed).
+    Recordings with the old key press/release/duration events come back as key holds."""
+    if filename.endswith(BINARY_EXTENSION):
+        return load_binary(filename)
+    with open(filename, "r") as f:
+        recording = json.load(f)
+    recording["events"] = normalize_holds(recording.get("events", []))
+    return recording
+
+def save_json(filename, recording):
+    """Export a recording in JSON (key holds as single events)"""
+    if isinstance(recording, ColumnarRecording):
+        recording = recording.to_json_dict()
+    else:
+        recording = dict(recording, events=normalize_holds(recording.get("events", [])))
+    with open(filename, "w") as f:
+        json.dump(recording, f)
+    return len(recording.get("events", []))
+
+def _align(size, alignment=8):
+    return (size + alignment - 1) // alignment * alignment
+
+def convert_file(path, to_json=False):
+    """Convert one recording between formats, returns the new path"""
+    base = os.path.splitext(path)[0]
+    if to_json:
+        target = base + JSON_EXTENSION
+        save_json(target, load_binary(path))
+    else:
+        target = base + BINARY_EXTENSION
+        with open(path, "r") as f:
+            save_binary(target, json.load(f))
+    return target
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert recordings between JSON and the binary format")
+    parser.add_argument("paths", nargs="*", help="Files to convert (default: every recording in recordings/)")
+    parser.add_argument("--to-json", action="store_true", help="Export binary recordings back to JSON")
+    args = parser.parse_args()
+
+    paths = args.paths
+    if not paths:
+        recordings_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+        pattern = "*" + (BINARY_EXTENSION if args.to_json else JSON_EXTENSION)
+        paths = sorted(glob.glob(os.path.join(recordings_dir, pattern)))
+
+    for path in paths:
+        try:
+            target = convert_file(path, to_json=args.to_json)
+            print(f"{path} -> {target} ({os.path.getsize(path)} -> {os.path.getsize(target)} bytes)")
+        except Exception as e:
+            print(f"Failed to convert {path}: {str(e)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
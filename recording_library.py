@@ -0,0 +1,148 @@
+import os
+import json
+import threading
+
+import numpy as np
+
+import recording_format
+from recording_format import ColumnarRecording, EV_MOVE, EV_CLICK, EV_SCROLL, EV_KEY_HOLD, EVENT_NAMES
+
+INDEX_FILENAME = ".library.json"
+INDEX_VERSION = 2  # 2: recordings summarized as key holds
+
+def summarize(recording):
+    """Summary stats of a recording (either format) without keeping its events"""
+    if not isinstance(recording, ColumnarRecording):
+        recording = recording_format.from_json_dict(recording)
+    cols = recording.columns
+    ops = np.asarray(cols["op"])
+    counts = np.bincount(ops, minlength=len(EVENT_NAMES)) if len(ops) else np.zeros(len(EVENT_NAMES), dtype=int)
+
+    # Keys that were held at least once, by recorded name
+    press_codes = np.unique(np.asarray(cols["code"])[ops == EV_KEY_HOLD])
+    keys = sorted({recording.names[code] for code in press_codes.tolist()})
+
+    # Bounding box (relative coordinates) of everything that has a position
+    positioned = (ops == EV_MOVE) | (ops == EV_CLICK) | (ops == EV_SCROLL)
+    if positioned.any():
+        xs = np.asarray(cols["x"])[positioned]
+        ys = np.asarray(cols["y"])[positioned]
+        bbox = [float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())]
+    else:
+        bbox = None
+
+    return {
+        "duration": recording.duration,
+        "events": int(len(ops)),
+        "counts": {EVENT_NAMES[op]: int(counts[op]) for op in sorted(EVENT_NAMES) if counts[op]},
+        "keys": keys,
+        "bbox": bbox,
+        "virtual_screen": recording.virtual_screen,
+        "gaming_mode": bool(recording.gaming_mode)
+    }
+
+class RecordingLibrary:
+    """Persistent index of the recordings in a directory.
+
+    Each entry is keyed by file name and remembers the file's mtime and size
+    with its summary, so `refresh` only opens files that were added or changed
+    since the last scan.
+    """
+
+    def __init__(self, directory, index_path=None):
+        self.directory = directory
+        self.index_path = index_path or os.path.join(directory, INDEX_FILENAME)
+        self.entries = {}  # File name -> {"mtime_ns", "size", "summary"}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._stop = threading.Event()
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                self.entries = index.get("entries", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _save_index(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "entries": self.entries}, f)
+        os.replace(temp_path, self.index_path)
+
+    def refresh(self):
+        """Re-scan the directory; returns (added, changed, removed) file names"""
+        with self._lock:
+            seen = {}
+            try:
+                with os.scandir(self.directory) as it:
+                    for entry in it:
+                        # Skip the index itself (dotfile) and temp files of saves in progress
+                        if (entry.name.startswith(".") or not entry.is_file()
+                                or os.path.splitext(entry.name)[1] not in recording_format.RECORDING_EXTENSIONS):
+                            continue
+                        stat = entry.stat()
+                        seen[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+
+            added, changed = [], []
+            for filename, (mtime_ns, size) in seen.items():
+                entry = self.entries.get(filename)
+                if entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+                    continue
+                try:
+                    summary = summarize(recording_format.load_recording(os.path.join(self.directory, filename)))
+                except (OSError, ValueError, KeyError, IndexError):
+                    summary = None  # Unreadable; retried when the file changes again
+                (changed if entry else added).append(filename)
+                self.entries[filename] = {"mtime_ns": mtime_ns, "size": size, "summary": summary}
+            removed = [filename for filename in self.entries if filename not in seen]
+            for filename in removed:
+                del self.entries[filename]
+
+            if added or changed or removed:
+                try:
+                    self._save_index()
+                except OSError:
+                    pass
+            return added, changed, removed
+
+    def names(self):
+        """Recording names (no extension), one per name even if both formats exist"""
+        with self._lock:
+            return sorted({os.path.splitext(filename)[0] for filename in self.entries})
+
+    def summary(self, name):
+        """Summary of a recording by name (binary preferred), None if unknown"""
+        with self._lock:
+            for ext in recording_format.RECORDING_EXTENSIONS:
+                entry = self.entries.get(name + ext)
+                if entry:
+                    return entry["summary"]
+        return None
+
+    def start_polling(self, interval=2.0, on_change=None):
+        """Refresh in the background every `interval` seconds (stat calls only
+        unless something changed); on_change(added, changed, removed) fires on changes"""
+        if self._poller:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                result = self.refresh()
+                if on_change and any(result):
+                    on_change(*result)
+
+        self._poller = threading.Thread(target=poll, name="library-poll", daemon=True)
+        self._poller.start()
+
+    def stop_polling(self):
+        self._stop.set()
+        if self._poller:
+            self._poller.join()
+            self._poller = None
@@ -0,0 +1,62 @@
+import numpy as np
+
+from plan import OP_MOVE, OP_MOUSE_DOWN, OP_MOUSE_UP, OP_SCROLL
+from holds import hold_index
+
+class SeekState:
+    """Input state of a recording at a point in time"""
+
+    def __init__(self, time, index, held_keys, held_buttons, cursor):
+        self.time = time                  # Recording seconds
+        self.index = index                # First row at or after `time`
+        self.held_keys = held_keys        # VK code -> recorded release time (inf = never)
+        self.held_buttons = held_buttons  # Button id -> (x, y) it was pressed at
+        self.cursor = cursor              # (x, y, rel_x, rel_y) of the last positioned row, or None
+
+class SeekIndex:
+    """Time index over a plan: the row and the exact held keys, pressed
+    buttons and cursor position at any timestamp.
+
+    Held keys and buttons come from the plan's hold intervals (holds.py), and
+    the last positioned row before each row is precomputed. A lookup is a
+    few binary searches, so seeking costs the same near the end of an
+    hour-long recording as at its start.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.holds = hold_index(plan)
+        ops = plan.ops
+        positioned = (ops == OP_MOVE) | (ops == OP_MOUSE_DOWN) | (ops == OP_MOUSE_UP) | (ops == OP_SCROLL)
+        # Row of the latest positioned event at or before each row (-1 = none yet)
+        self.last_position = np.maximum.accumulate(np.where(positioned, np.arange(len(ops)), -1))
+
+    @property
+    def nbytes(self):
+        return self.last_position.nbytes
+
+    def index_at(self, time):
+        """First row at or after `time` (recording seconds)"""
+        return int(np.searchsorted(self.plan.times, time, side="left"))
+
+    def state_at(self, time):
+        """SeekState of everything held down and where the cursor was just before `time`"""
+        plan = self.plan
+        index = self.index_at(time)
+        keys, buttons = self.holds.keys, self.holds.buttons
+        held_keys = {int(keys.codes[i]): float(keys.ends[i]) for i in keys.held_at(time).tolist()}
+        held_buttons = {}
+        for i in buttons.held_at(time).tolist():
+            row = buttons.rows[i]
+            held_buttons[int(buttons.codes[i])] = (int(plan.abs_x[row]), int(plan.abs_y[row]))
+        cursor = None
+        if index > 0 and self.last_position[index - 1] >= 0:
+            row = self.last_position[index - 1]
+            cursor = (int(plan.abs_x[row]), int(plan.abs_y[row]), float(plan.rel_x[row]), float(plan.rel_y[row]))
+        return SeekState(time, index, held_keys, held_buttons, cursor)
+
+def seek_index(plan):
+    """The plan's SeekIndex, built on first use and cached on the plan"""
+    if plan.seek_index is None:
+        plan.seek_index = SeekIndex(plan)
+    return plan.seek_index
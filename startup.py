@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import array
+import zlib
+import struct
+import threading
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """Wall-clock breakdown of the startup phases (enabled by --profile-startup)"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.phases = []  # (name, seconds)
+        self._last_mark = self.origin
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+            self._last_mark = time.perf_counter()
+
+    def mark(self, name):
+        """Record the time since the previous phase or mark as its own phase"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def report(self, title, budget=None, file=sys.stdout):
+        """Print the phases so far; returns False if the total exceeds budget (seconds)"""
+        total = self.elapsed()
+        print(f"{title}: {total * 1000:.1f}ms", file=file)
+        for name, seconds in self.phases:
+            print(f"  {name:<28} {seconds * 1000:8.1f}ms", file=file)
+        self.phases = []
+        if budget is not None and total > budget:
+            print(f"  OVER BUDGET ({budget * 1000:.0f}ms)", file=file)
+            return False
+        return True
+
+class Deferred:
+    """An object built on first use, or ahead of time by `preload` on a
+    background thread. Attribute access goes straight to the built object."""
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def get(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    object.__setattr__(self, "_value", self._factory())
+        return self._value
+
+    def peek(self):
+        """The object if it has been built, else None (never builds it)"""
+        return self._value
+
+    def preload(self):
+        """Build in the background so the first real use doesn't wait"""
+        threading.Thread(target=self.get, daemon=True).start()
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get(), name, value)
+
+# Decoded icon cache: magic, width, height, source CRC-32, source size, then
+# width*height*4 float32 RGBA values in 0..1 (what add_static_texture wants)
+ICON_CACHE_MAGIC = b"RMICON2\0"
+_ICON_HEADER = struct.Struct("<8sIIqq")
+
+def load_icon_rgba(icon_path, cache_path):
+    """(width, height, rgba floats) for an icon, decoded once and cached on disk.
+
+    The cache is keyed by the icon's contents (CRC-32 and size), not its
+    mtime: a one-file build extracts the icon afresh on every launch. PIL is
+    only imported when the cache is missing or stale.
+    """
+    with open(icon_path, "rb") as f:
+        source = f.read()
+    checksum, source_size = zlib.crc32(source), len(source)
+    try:
+        with open(cache_path, "rb") as f:
+            magic, width, height, cached_checksum, size = _ICON_HEADER.unpack(f.read(_ICON_HEADER.size))
+            if magic == ICON_CACHE_MAGIC and cached_checksum == checksum and size == source_size:
+                data = array.array("f")
+                data.frombytes(f.read(width * height * 4 * data.itemsize))
+                if len(data) == width * height * 4:
+                    return width, height, data
+    except (OSError, struct.error):
+        pass
+
+    from PIL import Image
+    img = Image.open(icon_path)
+    # ICO files hold several sizes; use the largest one
+    sizes = img.info.get("sizes")
+    if sizes:
+        img.size = max(sizes)
+    img = img.convert("RGBA")
+    width, height = img.size
+    data = array.array("f", (value / 255.0 for value in img.tobytes()))
+
+    try:
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_ICON_HEADER.pack(ICON_CACHE_MAGIC, width, height, checksum, source_size))
+            f.write(data.tobytes())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+    return width, height, data
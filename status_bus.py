@@ -0,0 +1,47 @@
+from collections import deque
+
+class StatusBus:
+    """Status records from engine threads to the UI thread.
+
+    Any thread can `post(topic, *values)`: one append to a bounded deque,
+    atomic under the GIL and lock-free, so publishing costs the hot paths
+    next to nothing. When the UI falls behind, the oldest records are
+    dropped. The UI thread calls `dispatch` once per frame. Only the latest
+    record per topic is delivered, since the UI shows current state, not
+    history. Topics without a subscriber go to `fallback`. Pollers run on
+    every dispatch to sample counters that change too often to post.
+    """
+
+    def __init__(self, maxlen=4096, fallback=None):
+        self._queue = deque(maxlen=maxlen)
+        self._subscribers = {}  # Topic -> callbacks (UI thread only)
+        self._pollers = []
+        self.fallback = fallback  # fallback(topic, *values)
+
+    def post(self, topic, *values):
+        self._queue.append((topic, values))
+
+    def subscribe(self, topic, callback):
+        self._subscribers.setdefault(topic, []).append(callback)
+
+    def add_poller(self, poller):
+        self._pollers.append(poller)
+
+    def dispatch(self):
+        """Deliver what was posted since the last call; returns the number of topics delivered"""
+        latest = {}
+        queue = self._queue
+        while queue:
+            topic, values = queue.popleft()
+            latest.pop(topic, None)  # Re-insert so topics keep the order of their last post
+            latest[topic] = values
+        for topic, values in latest.items():
+            callbacks = self._subscribers.get(topic)
+            if callbacks:
+                for callback in callbacks:
+                    callback(*values)
+            elif self.fallback:
+                self.fallback(topic, *values)
+        for poller in self._pollers:
+            poller()
+        return len(latest)
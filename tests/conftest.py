@@ -0,0 +1,34 @@
+"""Shared test setup: the project root on sys.path, and players that never see
+the developer's config.json."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import Config
+from player import Player
+from input_backend import SimulatedBackend
+
+SCREEN = {"left": 0, "top": 0, "width": 1920, "height": 1080}
+
+@pytest.fixture
+def config(tmp_path):
+    """Default settings, neither read from nor written to the repo's config.json"""
+    return Config(config_path=str(tmp_path / "config.json"), persist=False)
+
+@pytest.fixture
+def backend():
+    return SimulatedBackend()
+
+@pytest.fixture
+def player(config, backend):
+    return Player(backend=backend, config=config)
+
+@pytest.fixture
+def make_recording():
+    """make_recording(events) -> recording dict on a 1920x1080 screen"""
+    def make(events):
+        return {"virtual_screen": dict(SCREEN), "events": list(events), "gaming_mode": False}
+    return make
@@ -0,0 +1,67 @@
+"""Config writes: failed writes are retried, concurrent saves don't collide."""
+import os
+import json
+import time
+import threading
+
+from config import Config
+
+def test_failed_write_stays_pending(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    config = Config(config_path=str(path), save_delay=0.01, max_delay=0.05)
+    config.set("playback_speed", 2.0)
+
+    real_replace = os.replace
+    def failing_replace(src, dst):
+        raise OSError("locked")
+    monkeypatch.setattr("config.os.replace", failing_replace)
+    try:
+        config.save()
+    except OSError:
+        pass
+    assert config._dirty_since is not None  # Not written, still pending
+
+    monkeypatch.setattr("config.os.replace", real_replace)
+    config.flush()
+    assert config._dirty_since is None
+    assert json.loads(path.read_text())["playback_speed"] == 2.0
+
+def test_writer_retries_after_a_failed_write(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    config = Config(config_path=str(path), save_delay=0.01, max_delay=0.05)
+    real_replace = os.replace
+    failures = []
+    def flaky_replace(src, dst):
+        if not failures:
+            failures.append(dst)
+            raise OSError("locked")
+        real_replace(src, dst)
+    monkeypatch.setattr("config.os.replace", flaky_replace)
+
+    config.set("hover_delay", 0.2)
+    deadline = time.monotonic() + 2.0
+    while config._dirty_since is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert failures and config._dirty_since is None
+    assert json.loads(path.read_text())["hover_delay"] == 0.2
+
+def test_concurrent_saves_keep_the_file_whole(tmp_path):
+    path = tmp_path / "config.json"
+    config = Config(config_path=str(path), persist=False)
+    config.persist = True
+    errors = []
+    def save_many(offset):
+        for i in range(50):
+            config.update({"repeat_count": offset + i})
+            try:
+                config.save()
+            except OSError as e:
+                errors.append(e)
+    threads = [threading.Thread(target=save_many, args=(n * 100,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert json.loads(path.read_text())["repeat_count"] == config.get("repeat_count")
+    assert config.writes == 200
@@ -0,0 +1,40 @@
+"""Dead-time trimming must not cut into holds still down at the end."""
+import pytest
+
+from idle_trim import compress_idle
+
+@pytest.fixture
+def recording(make_recording):
+    # Idle start, a tap, a long gap, D held past the last move, then the stop hotkey
+    return make_recording([
+        ("key_press", "a", 3.0),
+        ("key_release", "a", 3.1),
+        ("move", 0.5, 0.5, 3.5),
+        ("key_press", "d", 5.0),
+        ("move", 0.6, 0.5, 5.2),
+        ("key_release", "d", 7.0),
+        ("key_press", "f6", 15.0),
+        ("key_release", "f6", 15.1),
+    ])
+
+def test_report_uses_end_of_last_hold(player, backend, recording):
+    plan = player.compile(recording)
+    trimmed, report = compress_idle(plan, max_gap=1.5, drop_codes=(backend.resolve_vk("f6"),))
+
+    assert trimmed.times.tolist() == [0.0, 0.5, 2.0, 2.2]
+    assert trimmed.end_time == 4.0
+    assert report["recorded_duration"] == 15.1
+    assert report["duration"] == 4.0
+    assert abs(report["time_saved"] - 11.1) < 1e-9
+
+def test_trimmed_loops_do_not_overlap_holds(player, backend, recording):
+    player.human_like_mouse = False
+    player.set_speed(4.0)
+    plan = player.compile(recording)
+    trimmed, _ = compress_idle(plan, max_gap=1.5, drop_codes=(backend.resolve_vk("f6"),))
+    player.play(trimmed, loops=2)
+
+    d = backend.resolve_vk("d")
+    d_actions = [action for _, action, args in backend.log if args == (d,)]
+    assert d_actions == ["key_down", "key_up"] * 2
+    assert not backend.held_keys
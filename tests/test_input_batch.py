@@ -0,0 +1,62 @@
+"""BatchingBackend sends each scheduler tick's actions in one sink call."""
+import pytest
+
+from player import Player
+from input_batch import BatchingBackend, ListSink
+from input_backend import SimulatedBackend
+
+@pytest.fixture
+def sink():
+    return ListSink()
+
+@pytest.fixture
+def batched_player(config, sink):
+    player = Player(backend=BatchingBackend(SimulatedBackend(), sink), config=config)
+    player.human_like_mouse = False
+    player.jitter = 0
+    return player
+
+def _catch_up(player):
+    # Always "behind": clicks go straight to the target without the settle delay
+    player.catch_up_threshold = -1.0
+    player.hover_delay = 0.0
+
+@pytest.fixture
+def recording(make_recording):
+    return make_recording([
+        ("key_hold", "w", 0.5, 0.0),
+        ("move", 0.2, 0.2, 0.05),
+        ("click", 0.5, 0.5, "left", True, 0.1),
+        ("click", 0.5, 0.5, "left", False, 0.4),
+        ("move", 0.6, 0.6, 0.45),
+    ])
+
+def _actions(sink):
+    return [action for _, batch in sink.batches for action in batch]
+
+def test_counters_match_the_sink(batched_player, sink, recording):
+    _catch_up(batched_player)
+    batched_player.play(recording)
+    backend = batched_player.backend
+    assert backend.calls == len(sink.batches)
+    assert backend.actions == len(_actions(sink))
+    assert backend.calls < backend.actions
+    assert backend.stats()["actions_per_call"] == backend.actions / backend.calls
+    # Everything pressed was released again
+    kinds = [action[0] for action in _actions(sink)]
+    assert kinds.count("key_down") == kinds.count("key_up") == 1
+    assert kinds.count("mouse_down") == kinds.count("mouse_up") == 1
+
+def test_move_and_mouse_down_at_one_instant_are_one_call(batched_player, sink, recording):
+    _catch_up(batched_player)
+    batched_player.play(recording)
+
+    x, y = 960, 540
+    batch = next(batch for _, batch in sink.batches if any(action[0] == "mouse_down" for action in batch))
+    assert batch == [("move", x, y), ("mouse_down", x, y, 1)]
+
+def test_seek_restores_held_input_in_one_call(batched_player, sink, recording):
+    # Starting inside the click: cursor, button and key all go out together
+    batched_player.play(recording, start_at=0.2)
+    first = sink.batches[0][1]
+    assert sorted(action[0] for action in first) == ["key_down", "mouse_down", "move"]
@@ -0,0 +1,31 @@
+"""Looped playback must wait for holds that outlast the last event."""
+import pytest
+
+@pytest.fixture
+def recording(make_recording):
+    # W tap, a move, then W held well past the last row
+    return make_recording([
+        ("key_press", "w", 0.0),
+        ("key_release", "w", 0.05),
+        ("move", 0.5, 0.5, 0.1),
+        ("key_press", "w", 0.2),
+        ("key_release", "w", 0.8),
+    ])
+
+def test_end_time_includes_trailing_release(player, recording):
+    plan = player.compile(recording)
+    assert plan.duration == 0.2
+    assert plan.end_time == 0.8
+
+def test_loop_waits_for_trailing_hold(player, backend, recording):
+    player.human_like_mouse = False
+    player.play(player.compile(recording), loops=2)
+
+    keys = [(ns, action) for ns, action, _ in backend.log if action in ("key_down", "key_up")]
+    # Every press gets its own release: down/up alternate, nothing swallowed
+    assert [action for _, action in keys] == ["key_down", "key_up"] * 4
+    started = keys[0][0]
+    second_iteration = (keys[4][0] - started) / 1e9
+    assert second_iteration >= 0.79
+    assert player.iterations[0]["duration"] >= 0.79
+    assert not backend.held_keys
@@ -0,0 +1,38 @@
+"""PlanCache compiles outside its lock, once per plan."""
+import time
+import threading
+
+import plan as plan_module
+from plan import PlanCache
+
+GEOMETRY = (0, 0, 1920, 1080)
+
+def test_slow_compile_blocks_only_its_own_key(monkeypatch, make_recording):
+    compile_recording = plan_module.compile_recording
+    calls = []
+    def slow_compile(recording, geometry, resolve_vk):
+        calls.append(recording)
+        if recording.get("slow"):
+            time.sleep(0.3)
+        return compile_recording(recording, geometry, resolve_vk)
+    monkeypatch.setattr(plan_module, "compile_recording", slow_compile)
+
+    cache = PlanCache()
+    recording = make_recording([("move", 0.5, 0.5, 0.0)])
+    slow = dict(recording, slow=True)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(slow, GEOMETRY, lambda key: 0, key="slow")))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    cache.get(recording, GEOMETRY, lambda key: 0, key="fast")
+    cache.clear()
+    assert time.perf_counter() - started < 0.1
+
+    for thread in threads:
+        thread.join()
+    assert len({id(plan) for plan in results}) == 1
+    assert sum(1 for recording in calls if recording.get("slow")) == 1
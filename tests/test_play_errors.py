@@ -0,0 +1,17 @@
+"""A recording that fails to compile must not leave the player busy."""
+import pytest
+
+def test_compile_error_does_not_leave_player_playing(player, backend, make_recording):
+    with pytest.raises(IndexError):
+        player.play(make_recording([("move", 0.5)]))  # Malformed: no y or timestamp
+    assert not player.is_playing
+
+    # The next play() runs instead of silently returning
+    player.play(make_recording([("move", 0.5, 0.5, 0.0)]))
+    assert any(action == "move" for _, action, _ in backend.log)
+
+def test_stop_after_compile_error_returns_at_once(player, make_recording):
+    with pytest.raises(IndexError):
+        player.play(make_recording([("move", 0.5)]))
+    # Nothing is playing, so stop() must not wait out its timeout
+    assert player.stop(timeout=5.0)
@@ -0,0 +1,16 @@
+"""A stop sent right behind a play must cancel that run in the worker."""
+from playback_worker import PlaybackWorker
+
+def test_stop_before_run_starts_is_not_lost(player, config, make_recording):
+    plan = player.compile(make_recording([("key_hold", "w", 0.1, 0.0), ("move", 0.5, 0.5, 10.0)]))
+    worker = PlaybackWorker(config)
+    worker.start()
+    try:
+        for _ in range(5):
+            # Both messages are queued before the worker's playback thread exists
+            worker._done.clear()
+            worker._channel.send(("play", plan, 1, None, None, 0.0, False))
+            worker._channel.send(("stop",))
+            assert worker._done.wait(2.0)
+    finally:
+        worker.close()
@@ -0,0 +1,113 @@
+"""Old recordings (JSON key triplets, version 1 binaries) convert to key holds
+without losing input, and every format round-trips."""
+import math
+
+import numpy as np
+import pytest
+
+import recording_format
+from recording_format import (ColumnarRecording, COLUMNS, EVENT_KINDS, EV_KEY_DURATION, EV_MOVE, EV_CLICK,
+                              EV_SCROLL, normalize_holds, from_json_dict, save_binary, load_binary,
+                              save_json, load_recording)
+
+# Coordinates are exact in float32 so the binary and JSON forms compile alike
+LEGACY_EVENTS = [
+    ("move", 0.25, 0.5, 0.0),
+    ("key_press", "w", 0.125),
+    ("key_press", "w", 0.25),      # Auto-repeat
+    ("key_press", "W", 0.375),     # Auto-repeat, other case
+    ("key_duration", "w", 0.375),
+    ("key_release", "w", 0.5),
+    ("key_release", "a", 0.625),   # Stray release, never pressed
+    ("click", 0.5, 0.5, "left", True, 0.75),
+    ("click", 0.5, 0.5, "left", False, 0.875),
+    ("scroll", 0.5, 0.5, 0, -1, 1.0),
+    ("key_press", "Key.shift", 1.125),  # Never released
+    ("move", 0.75, 0.25, 1.25),
+]
+
+HOLDS = [
+    ("move", 0.25, 0.5, 0.0),
+    ("key_hold", "w", 0.375, 0.125),
+    ("click", 0.5, 0.5, "left", True, 0.75),
+    ("click", 0.5, 0.5, "left", False, 0.875),
+    ("scroll", 0.5, 0.5, 0, -1, 1.0),
+    ("key_hold", "key.shift", None, 1.125),
+    ("move", 0.75, 0.25, 1.25),
+]
+
+def _write_v1(path, events, monkeypatch):
+    """A version 1 binary: key triplets as their own rows, key_duration at the previous event's time"""
+    columns = {name: np.zeros(len(events), dtype=dtype) for name, dtype in COLUMNS}
+    names = []
+    last_time = 0.0
+    for i, event in enumerate(events):
+        op = EVENT_KINDS[event[0]]
+        columns["op"][i] = op
+        columns["time"][i] = last_time if op == EV_KEY_DURATION else event[-1]
+        last_time = columns["time"][i]
+        if op in (EV_MOVE, EV_CLICK, EV_SCROLL):
+            columns["x"][i], columns["y"][i] = event[1], event[2]
+        if op == EV_CLICK:
+            columns["code"][i] = len(names)
+            names.append(event[3])
+            columns["extra"][i] = 1.0 if event[4] else 0.0
+        elif op == EV_SCROLL:
+            columns["code"][i], columns["extra"][i] = event[3], event[4]
+        elif op != EV_MOVE:
+            columns["code"][i] = len(names)
+            names.append(event[1])
+            if op == EV_KEY_DURATION:
+                columns["extra"][i] = event[2]
+    monkeypatch.setattr(recording_format, "VERSION", 1)
+    save_binary(str(path), ColumnarRecording(columns, names, {"left": 0, "top": 0, "width": 1920, "height": 1080}))
+    monkeypatch.undo()
+
+def _assert_same_plan(a, b):
+    for name in ("times", "ops", "rel_x", "rel_y", "abs_x", "abs_y", "codes"):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+    assert np.allclose(a.values, b.values, equal_nan=True)
+
+def test_normalize_holds_folds_triplets():
+    assert normalize_holds(LEGACY_EVENTS) == HOLDS
+
+def test_normalize_holds_leaves_holds_alone():
+    assert normalize_holds(HOLDS) is HOLDS
+
+def test_v1_binary_converts_like_legacy_json(tmp_path, monkeypatch, player, make_recording):
+    path = tmp_path / "old.rmb"
+    _write_v1(path, LEGACY_EVENTS, monkeypatch)
+    converted = load_binary(str(path))
+
+    ops = converted.columns["op"].tolist()
+    assert ops.count(recording_format.EV_KEY_HOLD) == 2
+    assert recording_format.EV_KEY_RELEASE not in ops and EV_KEY_DURATION not in ops
+    held = converted.columns["extra"][converted.columns["op"] == recording_format.EV_KEY_HOLD]
+    assert held[0] == 0.375 and math.isnan(held[1])
+
+    _assert_same_plan(player.compile(converted), player.compile(make_recording(LEGACY_EVENTS)))
+
+def test_binary_round_trip(tmp_path, make_recording):
+    path = str(tmp_path / "new.rmb")
+    assert save_binary(path, make_recording(LEGACY_EVENTS)) == len(HOLDS)
+    loaded = load_binary(path)
+    assert loaded.to_events() == HOLDS
+    assert not loaded.columns["time"].flags.writeable  # Still memory-mapped, not copied
+
+def test_json_round_trip(tmp_path, make_recording):
+    path = str(tmp_path / "old.json")
+    assert save_json(path, make_recording(LEGACY_EVENTS)) == len(HOLDS)
+    loaded = load_recording(path)
+    assert [tuple(event) for event in loaded["events"]] == HOLDS
+
+    # And back through the columnar form
+    again = str(tmp_path / "again.json")
+    save_json(again, from_json_dict(loaded))
+    assert [tuple(event) for event in load_recording(again)["events"]] == HOLDS
+
+def test_all_forms_compile_alike(tmp_path, monkeypatch, player, make_recording):
+    legacy = player.compile(make_recording(LEGACY_EVENTS))
+    _assert_same_plan(legacy, player.compile(make_recording(HOLDS)))
+    binary = str(tmp_path / "new.rmb")
+    save_binary(binary, make_recording(LEGACY_EVENTS))
+    _assert_same_plan(legacy, player.compile(load_recording(binary)))
@@ -0,0 +1,23 @@
+"""A stop() that comes in before play() starts must cancel that run."""
+import time
+
+import pytest
+
+@pytest.fixture
+def recording(make_recording):
+    return make_recording([("key_hold", "w", 0.2, 0.0), ("move", 0.5, 0.5, 0.5)])
+
+def test_stop_before_play_cancels_the_run(player, backend, recording):
+    player.arm()
+    player.stop()  # e.g. the stop hotkey while the plan was still loading
+    started = time.perf_counter()
+    player.play(recording, loops=3)
+    assert time.perf_counter() - started < 0.2
+    assert not backend.log
+    assert not player.is_playing
+
+def test_arm_clears_an_earlier_stop(player, backend, recording):
+    player.stop()
+    player.arm()
+    player.play(recording)
+    assert [action for _, action, _ in backend.log if action.startswith("key")] == ["key_down", "key_up"]
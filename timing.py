@@ -0,0 +1,251 @@
+import sys
+import time
+import ctypes
+import threading
+
+class PerfCounterClock:
+    """Monotonic nanosecond clock backed by time.perf_counter_ns (any OS)"""
+    name = "perf_counter_ns"
+
+    def now_ns(self):
+        return time.perf_counter_ns()
+
+class QpcClock:
+    """Windows QueryPerformanceCounter clock"""
+    name = "qpc"
+
+    def __init__(self):
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.QueryPerformanceCounter.argtypes = [ctypes.POINTER(ctypes.c_int64)]
+        kernel32.QueryPerformanceFrequency.argtypes = [ctypes.POINTER(ctypes.c_int64)]
+        freq = ctypes.c_int64()
+        kernel32.QueryPerformanceFrequency(ctypes.byref(freq))
+        self._freq = freq.value
+        self._counter = ctypes.c_int64()
+        self._query = kernel32.QueryPerformanceCounter
+
+        # Ask for 1ms scheduler granularity so the blocking part of a wait
+        # wakes up close to where we asked it to
+        try:
+            ctypes.WinDLL('winmm').timeBeginPeriod(1)
+        except (OSError, AttributeError):
+            pass
+
+    def now_ns(self):
+        self._query(ctypes.byref(self._counter))
+        return self._counter.value * 1_000_000_000 // self._freq
+
+def default_clock():
+    """Pick the best clock for this platform"""
+    if sys.platform == "win32":
+        try:
+            return QpcClock()
+        except (OSError, AttributeError):
+            pass
+    return PerfCounterClock()
+
+class PreciseTimer:
+    """Hybrid sleep-then-spin timer.
+
+    Blocks in the OS for most of a wait and only busy-waits for the last
+    `spin_threshold` seconds, plus however much the OS sleep has been
+    observed to overshoot. Every call records its wake-up error.
+    """
+
+    def __init__(self, clock=None, spin_threshold=0.0005):
+        self.clock = clock or default_clock()
+        self.spin_threshold = spin_threshold
+        self._oversleep = 0.0  # Smoothed OS sleep overshoot (seconds)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.calls = 0
+        self.last_error = 0.0
+        self.max_error = 0.0
+        self.total_error = 0.0
+        self.spin_time = 0.0
+
+    def now(self):
+        """Current clock reading in seconds"""
+        return self.clock.now_ns() / 1e9
+
+    def sleep(self, duration):
+        """Sleep for `duration` seconds, returns the wake-up error in seconds"""
+        if duration <= 0: return 0.0
+        return self.sleep_until(self.now() + duration)
+
+    def sleep_until(self, deadline, interrupt=None):
+        """Sleep until the clock reaches `deadline` (seconds, same base as now()).
+
+        If `interrupt` (a threading.Event) is set during the blocking phase the
+        wait ends early and None is returned instead of the wake-up error.
+        """
+        now_ns = self.clock.now_ns
+        target = int(deadline * 1e9)
+        if now_ns() >= target: return 0.0  # Already late, nothing to wait for
+
+        # Coarse phase: let the OS block us while we are far from the target
+        remaining = (target - now_ns()) / 1e9
+        coarse = remaining - self.spin_threshold - self._oversleep
+        if coarse > 0:
+            before = now_ns()
+            if interrupt is not None:
+                if interrupt.wait(coarse):
+                    return None
+            else:
+                time.sleep(coarse)
+            overshoot = (now_ns() - before) / 1e9 - coarse
+            # Exponential moving average keeps the estimate stable under jitter
+            self._oversleep = max(0.0, 0.9 * self._oversleep + 0.1 * overshoot)
+
+        # Fine phase: spin for the last sub-millisecond
+        spin_start = now_ns()
+        current = spin_start
+        while current < target:
+            current = now_ns()
+
+        error = (current - target) / 1e9
+        self.calls += 1
+        self.last_error = error
+        self.max_error = max(self.max_error, error)
+        self.total_error += error
+        self.spin_time += (current - spin_start) / 1e9
+        return error
+
+    def stats(self):
+        """Summary of achieved wake-up accuracy since the last reset"""
+        return {
+            "clock": self.clock.name,
+            "calls": self.calls,
+            "last_error": self.last_error,
+            "max_error": self.max_error,
+            "mean_error": self.total_error / self.calls if self.calls else 0.0,
+            "spin_time": self.spin_time,
+            "spin_threshold": self.spin_threshold
+        }
+
+class DriftReport:
+    """Lag of each event behind its scheduled deadline for one playback run"""
+
+    def __init__(self, late_tolerance=0.002):
+        self.late_tolerance = late_tolerance  # Lag (seconds) before an event counts as late
+        self.events = 0
+        self.late_events = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def record(self, lag):
+        self.events += 1
+        if lag > 0:
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+        if lag > self.late_tolerance:
+            self.late_events += 1
+
+    @property
+    def mean_lag(self):
+        return self.total_lag / self.events if self.events else 0.0
+
+    def as_dict(self):
+        return {
+            "events": self.events,
+            "late_events": self.late_events,
+            "max_lag": self.max_lag,
+            "mean_lag": self.mean_lag
+        }
+
+class PlaybackCancelled(Exception):
+    """Raised out of a wait whose CancelToken was cancelled"""
+
+class CancelToken:
+    """Shared stop signal for playback.
+
+    `cancel` sets the flag and wakes every linked event, so a wait blocked on
+    one of them returns within the timer's spin window instead of sleeping
+    out its deadline. Cancelling is safe from any thread.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._wake = []  # Events that interrupt blocking waits
+
+    def link(self, event):
+        """Also set `event` on cancel (e.g. the interrupt of a clock's waits)"""
+        self._wake.append(event)
+
+    def cancel(self):
+        self._cancelled.set()
+        for event in self._wake:
+            event.set()
+
+    def reset(self):
+        self._cancelled.clear()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        """Raise PlaybackCancelled if cancelled"""
+        if self._cancelled.is_set():
+            raise PlaybackCancelled()
+
+class PlaybackClock:
+    """Maps recording time to timer deadlines at a speed that can change mid-run.
+
+    Changing the speed re-anchors the mapping at the current position, so
+    everything not yet reached is rescheduled at the new rate and nothing
+    already played moves. Safe to change from any thread; a sleeping
+    `sleep_until` wakes up and re-targets, or raises PlaybackCancelled once
+    `cancel` is cancelled.
+    """
+
+    def __init__(self, timer, speed=1.0, cancel=None):
+        self.timer = timer
+        self.speed = speed
+        self.changed = threading.Event()  # Set on every speed change and on cancel
+        self.cancel = cancel or CancelToken()
+        self.cancel.link(self.changed)
+        self._lock = threading.Lock()
+        self._anchor_time = timer.now()  # Timer reading at the anchor
+        self._anchor_media = 0.0         # Recording time at the anchor
+
+    def start(self, speed=None, position=0.0):
+        """Recording time `position` is now"""
+        with self._lock:
+            if speed is not None:
+                self.speed = speed
+            self._anchor_time = self.timer.now()
+            self._anchor_media = position
+
+    def media_now(self):
+        """Current position in recording seconds"""
+        with self._lock:
+            return self._anchor_media + (self.timer.now() - self._anchor_time) * self.speed
+
+    def to_timer(self, media_time):
+        """Timer reading at which recording time `media_time` is reached"""
+        with self._lock:
+            return self._anchor_time + (media_time - self._anchor_media) / self.speed
+
+    def set_speed(self, speed):
+        if speed <= 0:
+            raise ValueError("Playback speed must be positive")
+        with self._lock:
+            now = self.timer.now()
+            self._anchor_media += (now - self._anchor_time) * self.speed
+            self._anchor_time = now
+            self.speed = speed
+        self.changed.set()
+
+    def sleep_until(self, media_time):
+        """Sleep until recording time `media_time`, following speed changes.
+
+        Raises PlaybackCancelled if the clock's CancelToken is (or gets) cancelled.
+        """
+        while True:
+            # Clear before checking so a cancel landing in between still wakes the wait
+            self.changed.clear()
+            self.cancel.check()
+            if self.timer.sleep_until(self.to_timer(media_time), interrupt=self.changed) is not None:
+                return